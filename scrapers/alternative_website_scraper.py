@@ -4,11 +4,9 @@ Uses Google Search API and pattern matching to find institution websites
 """
 import logging
 import re
-import time
 import os
-import requests
 from typing import Dict, List, Optional
-from urllib.parse import quote_plus
+from scrapers.shared.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +16,11 @@ class AlternativeWebsiteScraper:
 
     def __init__(self):
         self.rate_limit_delay = 1.0
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = http_client
+        # Sent with search requests, as before the shared client
+        self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
+        }
         # Google Custom Search API credentials (optional)
         self.google_api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
         self.google_cx = os.getenv("GOOGLE_SEARCH_CX")
@@ -33,7 +32,6 @@ class AlternativeWebsiteScraper:
             return None
         
         try:
-            time.sleep(self.rate_limit_delay)
             url = "https://www.googleapis.com/customsearch/v1"
             params = {
                 "key": self.google_api_key,
@@ -42,8 +40,9 @@ class AlternativeWebsiteScraper:
                 "num": 1,  # Only need the first result
             }
             
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            response = self.http.get(
+                url, min_interval=self.rate_limit_delay, use_cache=False, params=params, headers=self.headers
+            )
             data = response.json()
             
             if "items" in data and len(data["items"]) > 0:
@@ -234,20 +233,7 @@ class AlternativeWebsiteScraper:
     
     def _check_domain_exists(self, url: str) -> bool:
         """Check if a domain exists and is accessible"""
-        try:
-            # Use HEAD request for faster checking
-            response = requests.head(url, timeout=5, allow_redirects=True)
-            if response.status_code == 200:
-                return True
-            
-            # Some servers don't support HEAD, try GET
-            response = requests.get(url, timeout=5, allow_redirects=True, stream=True)
-            if response.status_code == 200:
-                return True
-        except:
-            pass
-        
-        return False
+        return self.http.probe(url)
     
     def find_websites_batch(self, institutions: List[Dict]) -> Dict[str, str]:
         """Find websites for multiple institutions"""
@@ -268,9 +254,6 @@ class AlternativeWebsiteScraper:
                 logger.info(f"✓ Found website for {name}: {website}")
             else:
                 logger.warning(f"✗ No website found for {name}")
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay)
         
         return websites
 
@@ -0,0 +1 @@
+# Parser and extraction benchmarks
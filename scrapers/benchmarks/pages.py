@@ -0,0 +1,101 @@
+"""
+Sample pages for the benchmarks
+
+Pages are either loaded from files (e.g. saved from a record/replay run) or
+generated to resemble the MySchoolGist layouts the scrapers parse.
+"""
+import random
+from typing import Dict, List
+
+from scrapers.shared.http_cache import build_response
+
+STATES = ["Lagos", "Oyo", "Kano", "Enugu", "Rivers", "Kaduna", "Ogun", "Osun", "Anambra", "Edo"]
+PROGRAMS = [
+    "B.Sc Computer Science",
+    "B.Eng Mechanical Engineering",
+    "MBBS Medicine and Surgery",
+    "LL.B Law",
+    "B.Pharm Pharmacy",
+    "B.A English Language",
+    "B.Sc Accounting",
+    "ND Business Administration",
+    "HND Electrical Engineering",
+    "Bachelor of Nursing Science",
+]
+FILLER = [
+    "Home",
+    "About Us",
+    "Contact",
+    "Admission News",
+    "Privacy Policy",
+    "Click here to read more about admission into the university this session",
+]
+
+
+def institution_list_page(rows: int = 300, seed: int = 1) -> bytes:
+    """Generate an institution list page with a table of institutions"""
+    rng = random.Random(seed)
+    body = ["<tr><th>S/N</th><th>Name</th><th>Year</th></tr>"]
+    for i in range(1, rows + 1):
+        state = rng.choice(STATES)
+        slug = f"university-{i}"
+        body.append(
+            f"<tr><td>{i}</td>"
+            f'<td><a href="/ng/{slug}-courses/">University of {state} {i}, {state}</a></td>'
+            f"<td>{rng.randint(1948, 2023)}</td></tr>"
+        )
+    return _page(f"<table class=\"list\">{''.join(body)}</table>")
+
+
+def courses_page(programs: int = 120, seed: int = 1) -> bytes:
+    """Generate a courses page mixing program names with navigation and prose"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(programs):
+        if rng.random() < 0.6:
+            items.append(f"<li>{rng.choice(PROGRAMS)}</li>")
+        else:
+            items.append(f"<li>{rng.choice(FILLER)}</li>")
+    rows = "".join(f"<tr><td>{rng.choice(PROGRAMS)}</td><td>4 years</td></tr>" for _ in range(programs // 4))
+    paragraphs = "".join(
+        f"<p>{rng.choice(PROGRAMS)} requires five credits including English Language and Mathematics.</p>"
+        for _ in range(programs // 4)
+    )
+    return _page(
+        f"<ul class=\"menu\">{''.join(items)}</ul>"
+        f"<table><tr><th>Course</th><th>Duration</th></tr>{rows}</table>"
+        f"<div class=\"course-list\">{paragraphs}</div>"
+    )
+
+
+def _page(content: str) -> bytes:
+    """Wrap content in site chrome: navigation, sidebar, scripts and footer"""
+    nav = "".join(f"<li><a href=\"/{i}\">{text}</a></li>" for i, text in enumerate(FILLER))
+    recent = "".join(
+        f"<div class=\"widget-post\"><a href=\"/ng/post-{i}/\"><img src=\"/img/{i}.jpg\" alt=\"\">"
+        f"<span>{FILLER[i % len(FILLER)]} {i}</span></a></div>"
+        for i in range(150)
+    )
+    script = "<script>" + "window.ads = window.ads || [];" * 200 + "</script>"
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>MySchoolGist</title>"
+        f"{script}<style>body {{ margin: 0 }}</style></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article>{content}</article></main>"
+        f"<aside class=\"sidebar\">{recent}</aside>"
+        f"<footer><p>&copy; MySchoolGist</p>{script}</footer></body></html>"
+    ).encode("utf-8")
+
+
+def load_pages(paths: List[str]) -> Dict[str, bytes]:
+    """Load saved pages, keyed by file name"""
+    pages = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            pages[path] = f.read()
+    return pages
+
+
+def as_response(url: str, body: bytes):
+    """Wrap a page in a requests.Response, as the scrapers receive it"""
+    return build_response(url, 200, {"Content-Type": "text/html; charset=utf-8"}, body)
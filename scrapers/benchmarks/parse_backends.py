@@ -0,0 +1,116 @@
+"""
+Benchmark HTML parser backends
+
+Times parsing each page with every installed backend, and the MySchoolGist
+institution-list and program extraction on top of it, and checks that every
+backend extracts exactly the same records as html.parser. The parse column
+times the parse each extraction runs: list pages go through the selectolax
+fast path when it is the backend, courses pages are always parsed with
+BeautifulSoup (make_soup, on lxml for selectolax).
+
+    python -m scrapers.benchmarks.parse_backends
+    python -m scrapers.benchmarks.parse_backends --list saved/private.html --courses saved/unilag.html
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from scrapers.benchmarks.pages import as_response, courses_page, institution_list_page, load_pages
+from scrapers.myschoolgist.scrape_programs import ProgramScraper
+from scrapers.myschoolgist.scraper import LIST_REGION, MySchoolGistScraper
+from scrapers.shared import html
+from scrapers.shared.html import SELECTOLAX, make_fast_tree, make_region_soup, make_soup, response_html
+
+logging.basicConfig(level=logging.WARNING)
+
+BASELINE = "html.parser"
+
+
+def available_backends() -> List[str]:
+    """Get the backends installed here, baseline first"""
+    backends = [BASELINE]
+    if html.HAS_LXML:
+        backends.append("lxml")
+    try:
+        import html5lib  # noqa: F401
+        backends.append("html5lib")
+    except ImportError:
+        pass
+    if html.LexborHTMLParser is not None:
+        backends.append(SELECTOLAX)
+    return backends
+
+
+def time_per_call(fn: Callable, repeat: int) -> float:
+    """Median wall time of a call, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--list", nargs="*", default=[], help="saved institution list pages")
+    parser.add_argument("--courses", nargs="*", default=[], help="saved courses pages")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per page")
+    args = parser.parse_args()
+
+    list_pages = load_pages(args.list) or {"generated list (300 rows)": institution_list_page()}
+    course_pages = load_pages(args.courses) or {"generated courses (120 items)": courses_page()}
+
+    list_scraper = MySchoolGistScraper()
+    program_scraper = ProgramScraper()
+
+    def extract_institutions(body: bytes):
+        return list_scraper._parse_institution_list(as_response("https://myschoolgist.com/ng/list/", body), "list", "private")
+
+    def extract_programs(body: bytes):
+        return program_scraper.parse_programs_page(
+            as_response("https://myschoolgist.com/ng/courses/", body), "courses", "Test University", "test-id"
+        )
+
+    def parse_list(body: bytes):
+        text = response_html(as_response("https://myschoolgist.com/ng/list/", body))
+        tree = make_fast_tree(text)
+        if tree and tree.find("table"):
+            return tree
+        return make_region_soup(text, LIST_REGION)
+
+    def parse_programs(body: bytes):
+        return make_soup(response_html(as_response("https://myschoolgist.com/ng/courses/", body)))
+
+    workloads = [(name, body, parse_list, extract_institutions) for name, body in list_pages.items()]
+    workloads += [(name, body, parse_programs, extract_programs) for name, body in course_pages.items()]
+
+    mismatches = 0
+    for name, body, parse, extract in workloads:
+        print(f"\n{name} ({len(body) / 1024:.0f} KiB)")
+        print(f"  {'backend':<12} {'parse ms':>10} {'extract ms':>11} {'records':>8}")
+        baseline = None
+        for backend in available_backends():
+            html.HTML_PARSER = backend
+            parse_ms = time_per_call(lambda: parse(body), args.repeat)
+            extract_ms = time_per_call(lambda: extract(body), args.repeat)
+            records = extract(body)
+
+            note = ""
+            if baseline is None:
+                baseline = records
+            elif records != baseline:
+                mismatches += 1
+                note = "  MISMATCH"
+            print(f"  {backend:<12} {parse_ms:>10.2f} {extract_ms:>11.2f} {len(records):>8}{note}")
+
+    if mismatches:
+        print(f"\n{mismatches} backend results differ from {BASELINE}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark ProgramScraper._is_program_name
+
+Runs the compiled classifier and the original one-re.search-per-pattern loop
+over every text node the program scraper classifies (li, table cells, divs
+and paragraphs), checks that both make the same decision for every text and
+reports the time per call. ProgramDetailsScraper's classifier is checked
+against its original loop on the same texts.
+
+    python -m scrapers.benchmarks.program_classifier
+    python -m scrapers.benchmarks.program_classifier saved/unilag.html saved/oau.html
+"""
+import argparse
+import logging
+import re
+import sys
+import time
+from typing import List
+
+from scrapers.benchmarks.pages import courses_page, load_pages
+from scrapers.myschoolgist.program_scraper import DETAIL_PROGRAM_PATTERNS, ProgramDetailsScraper
+from scrapers.myschoolgist.scrape_programs import COURSE_WORDS, PROGRAM_PATTERNS, SKIP_PATTERNS, ProgramScraper
+from scrapers.shared.html import make_soup
+
+logging.basicConfig(level=logging.WARNING)
+
+# Edge cases around anchors, case and the standalone-course rule
+EXTRA_TEXTS = [
+    "",
+    "B.Sc",
+    "BSc Computer Science",
+    "bsc computer science",
+    "S/N",
+    "Name of Course",
+    "Admission into B.Sc Computer Science 2023/2024",
+    "Computer Science Student",
+    "History, Culture and Heritage",
+    "History and International Studies",
+    "School of Engineering",
+    "Faculty of Law",
+    "Dr. John Doe, Dean of Engineering",
+    "© 2024 University of Lagos",
+    "Applied Research & Technology",
+    "Land Surveying Technology",
+    "Estate Management",
+    "Theatre Arts",
+    "ND Science Laboratory Technology",
+    "Read more about Medicine",
+    "Software Engineering",
+    "Fine and Applied Arts 2024",
+    "English Language",
+    "Physics",
+    "History and Diplomacy",
+    "Data Technology",
+    "Public Relations",
+    "A" * 250,
+    # Non-ASCII text takes the case-insensitive path
+    "\u017fchool of Engineering",
+    "Nursing Science \u2013 \u1ecc\u0300y\u1ecd\u0301 State",
+    "\u212aiswahili Studies",
+    "Facts and Figures \u00a9 2024",
+]
+
+
+def reference_is_program_name(text: str) -> bool:
+    """The classifier as it was before compilation: one re.search per pattern"""
+    if not text or len(text) < 5 or len(text) > 200:
+        return False
+
+    text_lower = text.lower().strip()
+    for pattern in SKIP_PATTERNS:
+        if re.search(pattern, text_lower, re.I):
+            return False
+
+    has_program_keyword = any(re.search(p, text, re.I) for p in PROGRAM_PATTERNS)
+    is_standalone_course = (
+        len(text.split()) <= 6
+        and not re.search(r"\d{4}", text)
+        and not text_lower.startswith("admission")
+        and not text_lower.startswith("screening")
+        and any(word in text_lower for word in COURSE_WORDS)
+    )
+    return has_program_keyword or is_standalone_course
+
+
+def reference_is_detail_program_name(text: str) -> bool:
+    """ProgramDetailsScraper's classifier before compilation"""
+    if not text or len(text) < 5:
+        return False
+    return any(re.search(p, text.lower(), re.I) for p in DETAIL_PROGRAM_PATTERNS)
+
+
+def detail_is_program_name(text: str) -> bool:
+    # The scraper is abstract and the classifier does not use its state
+    return ProgramDetailsScraper._is_program_name(None, text)
+
+
+def candidate_texts(body: bytes) -> List[str]:
+    """Texts the program scraper classifies on a page"""
+    soup = make_soup(body)
+    texts = [element.get_text(strip=True) for element in soup.find_all(["li", "div", "p"])]
+    for table in soup.find_all("table"):
+        for row in table.find_all("tr")[1:]:
+            cells = row.find_all(["td", "th"])
+            if cells:
+                texts.append(cells[0].get_text(strip=True))
+    return texts
+
+
+def time_calls(fn, texts: List[str], repeat: int) -> float:
+    """Best time per call over `repeat` passes, in microseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="saved courses pages")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over all texts")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) or {f"generated courses {seed}": courses_page(200, seed) for seed in range(5)}
+    texts = list(EXTRA_TEXTS)
+    for body in pages.values():
+        texts.extend(candidate_texts(body))
+
+    scraper = ProgramScraper()
+    mismatches = [text for text in texts if scraper._is_program_name(text) != reference_is_program_name(text)]
+    mismatches += [
+        text for text in texts if detail_is_program_name(text) != reference_is_detail_program_name(text)
+    ]
+    accepted = sum(1 for text in texts if scraper._is_program_name(text))
+
+    reference_us = time_calls(reference_is_program_name, texts, args.repeat)
+    compiled_us = time_calls(scraper._is_program_name, texts, args.repeat)
+
+    print(f"{len(texts)} texts from {len(pages)} pages, {accepted} classified as programs")
+    print(f"  re.search per pattern: {reference_us:8.2f} us/call")
+    print(f"  compiled alternation:  {compiled_us:8.2f} us/call ({reference_us / compiled_us:.1f}x)")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} texts classified differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,20 @@
 """
 Import scraped data to database via API
+
+Institutions stream from the scraper through cleaning, validation, the JSON
+backup and batching into the import API, so importing starts with the first
+list page.
 """
-import json
 import logging
-import requests
 import sys
 import os
-from typing import List, Dict
+from typing import Dict, Iterable, Optional
 
 # Add parent directory to path to allow imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scrapers.myschoolgist.scraper import MySchoolGistScraper
+from scrapers.shared.pipeline import import_records
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,115 +42,45 @@ def clean_for_json(obj):
         return obj
 
 
-def import_to_database(institutions: List[Dict], api_url: str = "http://localhost:3000"):
-    """Import institutions to database via API"""
-    endpoint = f"{api_url}/api/scrape/import"
-
-    payload = {
-        "institutions": institutions,
-        "source": "myschoolgist",
-    }
-
-    try:
-        # Send in batches to avoid timeout
-        batch_size = 100
-        total_created = 0
-        total_updated = 0
-        total_errors = []
-        
-        for i in range(0, len(institutions), batch_size):
-            batch = institutions[i:i + batch_size]
-            batch_payload = {
-                "institutions": batch,
-                "source": payload["source"],
-            }
-            
-            logger.info(f"Sending batch {i//batch_size + 1} ({len(batch)} institutions)...")
-            response = requests.post(
-                endpoint,
-                json=batch_payload,
-                headers={"Content-Type": "application/json"},
-                timeout=300,  # 5 minutes timeout
-            )
-            
-            if response.status_code != 200:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
-                logger.error(f"Batch {i//batch_size + 1} failed: {error_data}")
-                total_errors.extend([f"Batch {i//batch_size + 1}: {str(error_data)}"])
-                continue
-            
-            result = response.json()
-            total_created += result.get('results', {}).get('created', 0)
-            total_updated += result.get('results', {}).get('updated', 0)
-            if result.get('results', {}).get('errors'):
-                total_errors.extend(result['results']['errors'])
-        
-        logger.info(f"Import completed: Created {total_created}, Updated {total_updated}")
-        if total_errors:
-            logger.warning(f"Total errors: {len(total_errors)}")
-        
-        return {
-            'success': True,
-            'results': {
-                'created': total_created,
-                'updated': total_updated,
-                'errors': total_errors
-            }
-        }
-        result = response.json()
-        logger.info(f"Import successful: {result.get('message', '')}")
-        logger.info(f"Created: {result.get('results', {}).get('created', 0)}")
-        logger.info(f"Updated: {result.get('results', {}).get('updated', 0)}")
-        if result.get("results", {}).get("errors"):
-            logger.warning(f"Errors: {len(result['results']['errors'])}")
-        return result
-    except requests.RequestException as e:
-        logger.error(f"Error importing to database: {e}")
-        if hasattr(e, "response") and e.response:
-            try:
-                error_data = e.response.json()
-                logger.error(f"Error details: {json.dumps(error_data, indent=2)}")
-            except:
-                logger.error(f"Response text: {e.response.text}")
-        raise
+def import_to_database(institutions: Iterable[Dict], api_url: str = "http://localhost:3000", output_file: Optional[str] = None):
+    """Import institutions to database via API, cleaning and sending them in batches as they arrive"""
+    return import_records(
+        institutions,
+        f"{api_url}/api/scrape/import",
+        key="institutions",
+        source="myschoolgist",
+        noun="institutions",
+        batch_size=100,
+        output_file=output_file,
+        normalize=clean_for_json,
+    )
 
 
 def main():
     """Main function"""
     logger.info("Starting scraper and import process...")
 
-    # Scrape institutions
+    # Scrape institutions, cleaning them for JSON serialization, saving them to a
+    # JSON file as backup and importing them as each list page arrives
     scraper = MySchoolGistScraper()
-    institutions = scraper.scrape_institutions()
-
-    if not institutions:
-        logger.error("No institutions scraped!")
-        sys.exit(1)
-
-    logger.info(f"Scraped {len(institutions)} institutions")
-
-    # Clean data for JSON serialization
-    logger.info("Cleaning data for JSON serialization...")
-    cleaned_institutions = [clean_for_json(inst) for inst in institutions]
-    
-    # Save to JSON file as backup
     output_file = "scraped_institutions.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(cleaned_institutions, f, indent=2, ensure_ascii=False)
-    logger.info(f"Saved scraped data to {output_file}")
-
-    # Import to database
     try:
         api_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:3000"
         logger.info(f"Importing to database via {api_url}...")
-        import_to_database(cleaned_institutions, api_url)
-        logger.info("Import completed successfully!")
+        result = import_to_database(scraper.iter_institutions(), api_url, output_file)
     except Exception as e:
         logger.error(f"Import failed: {e}")
         logger.info(f"Data saved to {output_file} for manual import")
         sys.exit(1)
 
+    if not result["count"]:
+        logger.error("No institutions scraped!")
+        sys.exit(1)
+
+    logger.info(f"Scraped {result['count']} institutions")
+    logger.info(f"Saved scraped data to {output_file}")
+    logger.info("Import completed successfully!")
+
 
 if __name__ == "__main__":
     main()
-
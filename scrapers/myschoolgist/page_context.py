@@ -0,0 +1,230 @@
+"""
+Page-level extraction context for MySchoolGist course pages
+Values read from the page as a whole are the same for every program on it,
+so they are computed once per page (on first use) and shared
+"""
+import re
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+COMMON_SUBJECTS = [
+    "Mathematics", "English", "Physics", "Chemistry", "Biology",
+    "Economics", "Government", "Literature", "Geography", "History",
+    "Commerce", "Accounting", "Agricultural Science", "CRS", "IRS",
+]
+
+UTME_SUBJECT_PATTERNS = [
+    re.compile(r"UTME\s+subjects?[:\s]+([A-Za-z,\s]+)", re.I),
+    re.compile(r"JAMB\s+subjects?[:\s]+([A-Za-z,\s]+)", re.I),
+    re.compile(r"Required\s+subjects?[:\s]+([A-Za-z,\s]+)", re.I),
+]
+
+OLEVEL_SUBJECT_PATTERNS = [
+    re.compile(r"O['\s]?level\s+subjects?[:\s]+([A-Za-z,\s]+)", re.I),
+    re.compile(r"O['\s]?level\s+requirements?[:\s]+([A-Za-z,\s]+)", re.I),
+    re.compile(r"WAEC\s+subjects?[:\s]+([A-Za-z,\s]+)", re.I),
+]
+
+DURATION_PATTERNS = [
+    re.compile(r"(\d+)\s*years?", re.I),
+    re.compile(r"Duration[:\s]+(\d+)\s*years?", re.I),
+    re.compile(r"(\d+)\s*year\s+program", re.I),
+]
+
+JAMB_SCORE_PATTERNS = [
+    re.compile(r"JAMB\s+score[:\s]+(\d+)", re.I),
+    re.compile(r"UTME\s+score[:\s]+(\d+)", re.I),
+    re.compile(r"minimum\s+(\d+)\s+in\s+JAMB", re.I),
+]
+
+OLEVEL_REQUIREMENTS_PATTERN = re.compile(r"O['\s]?level[:\s]+([A-Z0-9,\s]+)", re.I)
+
+CAREER_PATTERNS = [
+    re.compile(r"career\s+opportunities?[:\s]+([^.]+)", re.I),
+    re.compile(r"job\s+opportunities?[:\s]+([^.]+)", re.I),
+    re.compile(r"graduates?\s+can\s+work\s+as[:\s]+([^.]+)", re.I),
+]
+
+DESCRIPTION_KEYWORDS = ["program", "course", "study", "degree"]
+
+# String types Tag.get_text() includes for li, p, div and table cells
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+LIST_ITEM = "li"
+TABLE_ROW = "table"
+DIV = "div"
+PARAGRAPH = "p"
+
+
+class PageContext:
+    """Page-wide extraction results shared by every program on a page"""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+
+    @cached_property
+    def text(self) -> str:
+        """Text of the whole page"""
+        return self.soup.get_text()
+
+    def _subjects(self, patterns: List[re.Pattern]) -> List[str]:
+        """Collect known subjects listed after any of the patterns"""
+        subjects = []
+        for pattern in patterns:
+            match = pattern.search(self.text)
+            if match:
+                found_subjects = [s.strip() for s in match.group(1).split(",")]
+                subjects.extend([s for s in found_subjects if s in COMMON_SUBJECTS])
+        return subjects
+
+    @cached_property
+    def utme_subjects(self) -> List[str]:
+        """UTME subjects listed on the page"""
+        return self._subjects(UTME_SUBJECT_PATTERNS)
+
+    @cached_property
+    def olevel_subjects(self) -> List[str]:
+        """O-level subjects listed on the page"""
+        return self._subjects(OLEVEL_SUBJECT_PATTERNS)
+
+    @cached_property
+    def duration(self) -> Optional[str]:
+        """Program duration stated on the page"""
+        for pattern in DURATION_PATTERNS:
+            match = pattern.search(self.text)
+            if match:
+                years = match.group(1)
+                return f"{years} years"
+        return None
+
+    @cached_property
+    def admission_requirements(self) -> Optional[Dict]:
+        """JAMB score and O-level requirements stated on the page"""
+        requirements = {}
+
+        for pattern in JAMB_SCORE_PATTERNS:
+            match = pattern.search(self.text)
+            if match:
+                requirements["jamb_score"] = int(match.group(1))
+                break
+
+        match = OLEVEL_REQUIREMENTS_PATTERN.search(self.text)
+        if match:
+            requirements["olevel_requirements"] = match.group(1).strip()
+
+        return requirements if requirements else None
+
+    @cached_property
+    def description(self) -> Optional[str]:
+        """First paragraph that reads like a program description"""
+        for p in self.soup.find_all("p"):
+            p_text = p.get_text(strip=True)
+            if len(p_text) > 50 and any(word in p_text.lower() for word in DESCRIPTION_KEYWORDS):
+                return p_text[:500]  # Limit to 500 chars
+        return None
+
+    @cached_property
+    def career_prospects(self) -> List[str]:
+        """Careers listed in the page's career section"""
+        for pattern in CAREER_PATTERNS:
+            match = pattern.search(self.text)
+            if match:
+                careers = [c.strip() for c in match.group(1).split(",")]
+                return careers[:10]  # Limit to 10
+        return []
+
+
+def _class_matches(tag: Tag, pattern: re.Pattern) -> bool:
+    """Match a class regex the way find_all(class_=pattern) does"""
+    classes = tag.get("class")
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        return pattern.search(classes) is not None
+    return any(pattern.search(value) for value in classes)
+
+
+def candidate_texts(
+    soup: BeautifulSoup, div_class: re.Pattern, include_paragraphs: bool = True
+) -> List[Tuple[str, str]]:
+    """Collect candidate program texts and their origin in one walk of the page
+
+    Gives the same (origin, text) pairs, in the same order, as searching the
+    page four times: every <li>, the first cell of every table row after each
+    table's first, every <div> whose class matches `div_class`, then every
+    <p>. Texts are get_text(strip=True), built from one flat list of the
+    page's stripped strings instead of re-walking each candidate's subtree.
+    """
+    strings: List[str] = []
+    items: List[list] = []
+    divs: List[list] = []
+    paragraphs: List[list] = []
+    tables: List[List[list]] = []
+    open_tables: List[List[list]] = []
+    open_rows: List[list] = []
+
+    # Frames of (element, children, start in strings, entries to fill with its text, close action)
+    stack = [(soup, iter(soup.contents), 0, None, None)]
+    while stack:
+        tag, children, start, entries, close = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if entries:
+                text = "".join(strings[start:])
+                for entry in entries:
+                    entry[0] = text
+            if close:
+                close.pop()
+            continue
+
+        if not isinstance(child, Tag):
+            if type(child) in TEXT_STRING_TYPES:
+                stripped = child.strip()
+                if stripped:
+                    strings.append(stripped)
+            continue
+
+        name = child.name
+        entries = []
+        close = None
+        if name == "li":
+            entries.append([None])
+            items.append(entries[-1])
+        elif name == "p":
+            if include_paragraphs:
+                entries.append([None])
+                paragraphs.append(entries[-1])
+        elif name == "div":
+            if _class_matches(child, div_class):
+                entries.append([None])
+                divs.append(entries[-1])
+        elif name == "table":
+            rows: List[list] = []
+            tables.append(rows)
+            open_tables.append(rows)
+            close = open_tables
+        elif name == "tr":
+            # A row's text is its first cell's; None until a cell is found
+            row = [None]
+            for rows in open_tables:
+                rows.append(row)
+            open_rows.append(row)
+            close = open_rows
+        elif name in ("td", "th"):
+            # The first cell of each enclosing row that has none yet
+            for row in open_rows:
+                if row[0] is None:
+                    row[0] = ""
+                    entries.append(row)
+
+        stack.append((child, iter(child.contents), len(strings), entries, close))
+
+    candidates = [(LIST_ITEM, entry[0]) for entry in items]
+    for rows in tables:
+        candidates.extend((TABLE_ROW, row[0]) for row in rows[1:] if row[0] is not None)
+    candidates.extend((DIV, entry[0]) for entry in divs)
+    candidates.extend((PARAGRAPH, entry[0]) for entry in paragraphs)
+    return candidates
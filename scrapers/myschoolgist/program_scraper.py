@@ -5,11 +5,22 @@ Scrapes detailed program information from course pages
 import logging
 import re
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
 from scrapers.shared.base_scraper import BaseScraper
+from scrapers.myschoolgist.page_context import COMMON_SUBJECTS, PageContext, candidate_texts
+from scrapers.shared.html import make_soup, response_html
 
 logger = logging.getLogger(__name__)
 
+# Program keywords for detail pages: degrees and the common fields only, so
+# subject names ("Physics", "English Language") are not taken for programs
+DETAIL_PROGRAM_PATTERNS = [
+    r"\b(B\.?Sc|B\.?A|B\.?Eng|B\.?Tech|B\.?Ed|LL\.?B|MBBS|B\.?Pharm|B\.?Agric|B\.?Arch|B\.?Vet|ND|HND|NCE|OND)\b",
+    r"\b(Computer Science|Engineering|Medicine|Law|Pharmacy|Agriculture|Architecture|Education)\b",
+    r"\b(Accounting|Business|Economics|Mass Communication|Political Science|Sociology|Psychology)\b",
+]
+DETAIL_PROGRAM_RE = re.compile("|".join(f"(?:{pattern})" for pattern in DETAIL_PROGRAM_PATTERNS), re.I)
+PROGRAM_DIV_CLASS = re.compile(r"course|program", re.I)
+
 
 class ProgramDetailsScraper(BaseScraper):
     """Scraper for program details from MySchoolGist course pages"""
@@ -27,40 +38,15 @@ class ProgramDetailsScraper(BaseScraper):
         if not response:
             return None
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = make_soup(response_html(response))
+        page = PageContext(soup)
         programs = []
 
         # Find program lists - could be in various formats
-        # Look for common patterns: lists, tables, divs with program names
-        
-        # Pattern 1: List items with program names
-        list_items = soup.find_all("li")
-        for item in list_items:
-            text = item.get_text(strip=True)
-            if self._is_program_name(text):
-                program = self._extract_program_info(text, institution_name, courses_url, soup)
-                if program:
-                    programs.append(program)
-
-        # Pattern 2: Table rows
-        tables = soup.find_all("table")
-        for table in tables:
-            rows = table.find_all("tr")[1:]  # Skip header
-            for row in rows:
-                cells = row.find_all(["td", "th"])
-                if len(cells) >= 1:
-                    text = cells[0].get_text(strip=True)
-                    if self._is_program_name(text):
-                        program = self._extract_program_info(text, institution_name, courses_url, soup)
-                        if program:
-                            programs.append(program)
-
-        # Pattern 3: Divs with program names
-        divs = soup.find_all("div", class_=re.compile(r"course|program", re.I))
-        for div in divs:
-            text = div.get_text(strip=True)
+        # List items, table rows and program divs, in that order, from a single walk of the page
+        for _, text in candidate_texts(soup, PROGRAM_DIV_CLASS, include_paragraphs=False):
             if self._is_program_name(text):
-                program = self._extract_program_info(text, institution_name, courses_url, soup)
+                program = self._extract_program_info(text, institution_name, courses_url, page)
                 if program:
                     programs.append(program)
 
@@ -71,40 +57,33 @@ class ProgramDetailsScraper(BaseScraper):
         if not text or len(text) < 5:
             return False
 
-        # Common program patterns
-        patterns = [
-            r"\b(B\.?Sc|B\.?A|B\.?Eng|B\.?Tech|B\.?Ed|LL\.?B|MBBS|B\.?Pharm|B\.?Agric|B\.?Arch|B\.?Vet|ND|HND|NCE|OND)\b",
-            r"\b(Computer Science|Engineering|Medicine|Law|Pharmacy|Agriculture|Architecture|Education)\b",
-            r"\b(Accounting|Business|Economics|Mass Communication|Political Science|Sociology|Psychology)\b",
-        ]
-
         text_lower = text.lower()
-        return any(re.search(p, text_lower, re.I) for p in patterns)
+        return DETAIL_PROGRAM_RE.search(text_lower) is not None
 
     def _extract_program_info(
-        self, program_text: str, institution_name: str, source_url: str, soup: BeautifulSoup
+        self, program_text: str, institution_name: str, source_url: str, page: PageContext
     ) -> Optional[Dict]:
         """Extract program information from text and page context"""
         # Extract degree type
         degree_type = self._extract_degree_type(program_text)
 
         # Extract UTME subjects (common patterns)
-        utme_subjects = self._extract_utme_subjects(program_text, soup)
+        utme_subjects = self._extract_utme_subjects(program_text, page)
 
         # Extract O-level subjects
-        olevel_subjects = self._extract_olevel_subjects(program_text, soup)
+        olevel_subjects = self._extract_olevel_subjects(program_text, page)
 
         # Extract duration
-        duration = self._extract_duration(program_text, soup)
+        duration = self._extract_duration(program_text, page)
 
         # Extract admission requirements
-        admission_requirements = self._extract_admission_requirements(program_text, soup)
+        admission_requirements = self._extract_admission_requirements(program_text, page)
 
         # Extract description
-        description = self._extract_description(program_text, soup)
+        description = self._extract_description(program_text, page)
 
         # Extract career prospects
-        career_prospects = self._extract_career_prospects(program_text, soup)
+        career_prospects = self._extract_career_prospects(program_text, page)
 
         program = {
             "name": program_text.strip(),
@@ -147,141 +126,37 @@ class ProgramDetailsScraper(BaseScraper):
 
         return None
 
-    def _extract_utme_subjects(self, text: str, soup: BeautifulSoup) -> List[str]:
+    def _extract_utme_subjects(self, text: str, page: PageContext) -> List[str]:
         """Extract required UTME subjects"""
-        subjects = []
-        
-        # Common UTME subjects
-        common_subjects = [
-            "Mathematics", "English", "Physics", "Chemistry", "Biology",
-            "Economics", "Government", "Literature", "Geography", "History",
-            "Commerce", "Accounting", "Agricultural Science", "CRS", "IRS",
-        ]
-
         # Look for subject mentions in text
         text_lower = text.lower()
-        for subject in common_subjects:
-            if subject.lower() in text_lower:
-                subjects.append(subject)
-
-        # Look for subject combinations in page
-        subject_patterns = [
-            r"UTME\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"JAMB\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"Required\s+subjects?[:\s]+([A-Za-z,\s]+)",
-        ]
-
-        page_text = soup.get_text()
-        for pattern in subject_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                found_subjects = [s.strip() for s in match.group(1).split(",")]
-                subjects.extend([s for s in found_subjects if s in common_subjects])
+        subjects = [subject for subject in COMMON_SUBJECTS if subject.lower() in text_lower]
+
+        # Add subject combinations listed on the page
+        subjects.extend(page.utme_subjects)
 
         return list(set(subjects))  # Remove duplicates
 
-    def _extract_olevel_subjects(self, text: str, soup: BeautifulSoup) -> List[str]:
+    def _extract_olevel_subjects(self, text: str, page: PageContext) -> List[str]:
         """Extract required O-level subjects"""
-        subjects = []
-        
-        common_subjects = [
-            "Mathematics", "English", "Physics", "Chemistry", "Biology",
-            "Economics", "Government", "Literature", "Geography", "History",
-            "Commerce", "Accounting", "Agricultural Science", "CRS", "IRS",
-        ]
-
-        # Look for O-level requirements
-        page_text = soup.get_text()
-        olevel_patterns = [
-            r"O['\s]?level\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"O['\s]?level\s+requirements?[:\s]+([A-Za-z,\s]+)",
-            r"WAEC\s+subjects?[:\s]+([A-Za-z,\s]+)",
-        ]
-
-        for pattern in olevel_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                found_subjects = [s.strip() for s in match.group(1).split(",")]
-                subjects.extend([s for s in found_subjects if s in common_subjects])
-
-        return list(set(subjects))
-
-    def _extract_duration(self, text: str, soup: BeautifulSoup) -> Optional[str]:
-        """Extract program duration"""
-        duration_patterns = [
-            r"(\d+)\s*years?",
-            r"Duration[:\s]+(\d+)\s*years?",
-            r"(\d+)\s*year\s+program",
-        ]
-
-        page_text = soup.get_text()
-        for pattern in duration_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                years = match.group(1)
-                return f"{years} years"
+        return list(set(page.olevel_subjects))
 
-        return None
+    def _extract_duration(self, text: str, page: PageContext) -> Optional[str]:
+        """Extract program duration"""
+        return page.duration
 
-    def _extract_admission_requirements(self, text: str, soup: BeautifulSoup) -> Optional[Dict]:
+    def _extract_admission_requirements(self, text: str, page: PageContext) -> Optional[Dict]:
         """Extract admission requirements"""
-        requirements = {}
-
-        page_text = soup.get_text()
-
-        # Extract JAMB score requirement
-        jamb_patterns = [
-            r"JAMB\s+score[:\s]+(\d+)",
-            r"UTME\s+score[:\s]+(\d+)",
-            r"minimum\s+(\d+)\s+in\s+JAMB",
-        ]
-
-        for pattern in jamb_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                requirements["jamb_score"] = int(match.group(1))
-                break
+        requirements = page.admission_requirements
+        return dict(requirements) if requirements else None
 
-        # Extract O-level requirements
-        olevel_pattern = r"O['\s]?level[:\s]+([A-Z0-9,\s]+)"
-        match = re.search(olevel_pattern, page_text, re.I)
-        if match:
-            requirements["olevel_requirements"] = match.group(1).strip()
-
-        return requirements if requirements else None
-
-    def _extract_description(self, text: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_description(self, text: str, page: PageContext) -> Optional[str]:
         """Extract program description"""
-        # Look for description paragraphs
-        paragraphs = soup.find_all("p")
-        for p in paragraphs:
-            p_text = p.get_text(strip=True)
-            if len(p_text) > 50 and any(word in p_text.lower() for word in ["program", "course", "study", "degree"]):
-                return p_text[:500]  # Limit to 500 chars
-
-        return None
+        return page.description
 
-    def _extract_career_prospects(self, text: str, soup: BeautifulSoup) -> List[str]:
+    def _extract_career_prospects(self, text: str, page: PageContext) -> List[str]:
         """Extract career prospects"""
-        prospects = []
-
-        page_text = soup.get_text()
-        
-        # Look for career section
-        career_patterns = [
-            r"career\s+opportunities?[:\s]+([^.]+)",
-            r"job\s+opportunities?[:\s]+([^.]+)",
-            r"graduates?\s+can\s+work\s+as[:\s]+([^.]+)",
-        ]
-
-        for pattern in career_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                careers = [c.strip() for c in match.group(1).split(",")]
-                prospects.extend(careers[:10])  # Limit to 10
-                break
-
-        return prospects
+        return list(page.career_prospects)
 
 
 if __name__ == "__main__":
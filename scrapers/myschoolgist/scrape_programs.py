@@ -3,37 +3,128 @@ Program Scraper for MySchoolGist
 Scrapes programs/courses from institution course pages
 """
 import logging
+import os
 import re
 import json
-import time
 import requests
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from scrapers.shared.http_client import http_client
+from scrapers.shared.async_fetch import AsyncFetcher
+from scrapers.shared.metrics import FetchMetrics
+from scrapers.myschoolgist.page_context import COMMON_SUBJECTS, PARAGRAPH, PageContext, candidate_texts
+from scrapers.shared.html import make_soup, response_html
+from scrapers.shared.parse_pool import parse_pool
 
 logger = logging.getLogger(__name__)
 
+# Institution websites are used when there is no courses page, so cap what we
+# are willing to download and parse
+MAX_PAGE_BYTES = int(os.getenv("PROGRAM_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Skip common non-program text (announcements, headers, etc.)
+SKIP_PATTERNS = [
+    r"^(s/n|no\.|number|name|program|course|faculty|department)",
+    r"^(click|read|view|see|more|less)",
+    r"^(admission|requirement|cutoff|jamb|utme)",
+    r"^(\d+)$",  # Just numbers
+    r"\d{4}[/-]\d{4}",  # Years like 2020/2021 (announcements)
+    r"admission\s+into",  # Admission announcements
+    r"screening\s+examination",  # Exam announcements
+    r"list\s+of",  # List headers
+    r"final\s+list",  # Admission lists
+    r"second\s+list|third\s+list|fourth\s+list",  # Multiple lists
+    r"according\s+to",  # Rankings/statements
+    r"times\s+higher\s+education",  # Rankings
+    r"world\s+university\s+ranking",  # Rankings
+    r"centre\s+of\s+excellence|center\s+of\s+excellence",  # Research centers (not programs)
+    r"facts\s+and\s+figures",  # Information pages
+    r"^history,?\s*",  # History pages
+    r"call\s+for\s+papers",  # Journal calls
+    r"byadmin|bypublication",  # News articles
+    r"journal\s+of",  # Journal names
+    r"volume\s+\d+|issue\s+\d+",  # Journal volumes/issues
+    r"campus\s+life",  # Campus information
+    r"official\s+news",  # News articles
+    r"^(college|centre|center|institute|school)\s+(of|for)\s+",  # Institution names (not programs)
+    r"campuses",  # Campus listings
+    r"©\s+\d{4}",  # Copyright notices
+    r"all\s+rights\s+reserved",  # Copyright text
+    r"designed\s+by",  # Footer text
+    r"^(dean|director|professor|dr\.|prof\.)\s+",  # Titles/positions
+    r"student$",  # "Computer Science Student" etc
+    r"^adeyemi\s+college",  # Institution names
+    r"^africa\s+centre",  # Research centers
+    r"^ace\s+",  # Centers of excellence
+    r"international\s+conference",  # Conference announcements
+    r"^about",  # About pages
+    r"philosophy|objectives|vision|mission",  # Institution info pages
+    r"sensitises|staff",  # News articles
+    r"centre\s+for\s+information",  # IT centers
+    r"applied\s+research\s+&\s+technology",  # Research centers
+]
+
+# Program/course keywords; a program name must match at least one
+PROGRAM_PATTERNS = [
+    r"\b(B\.?Sc|B\.?A|B\.?Eng|B\.?Tech|B\.?Ed|LL\.?B|MBBS|B\.?Pharm|B\.?Agric|B\.?Arch|B\.?Vet|ND|HND|NCE|OND)\b",
+    r"\b(Computer Science|Engineering|Medicine|Law|Pharmacy|Agriculture|Architecture|Education)\b",
+    r"\b(Accounting|Business|Economics|Mass Communication|Political Science|Sociology|Psychology)\b",
+    r"\b(Mathematics|Physics|Chemistry|Biology|Geography|History|Literature|English)\b",
+    r"\b(Mechanical|Electrical|Civil|Chemical|Petroleum|Aerospace)\s+Engineering\b",
+    r"\b(Software|Information|Data)\s+(Engineering|Science|Technology)\b",
+    r"\b(Public|International|Business)\s+(Administration|Relations)\b",
+    r"\b(Environmental|Marine|Food)\s+(Science|Engineering|Technology)\b",
+]
+
+
+def _alternation(patterns: List[str], flags: int = 0) -> re.Pattern:
+    """Compile patterns into one regex that matches wherever any of them does"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+# Patterns anchored with ^ (none has a top-level |) only need trying at the
+# start of the text. Every letter in SKIP_PATTERNS is lowercase, so on
+# lowercased ASCII text the (much slower) case-insensitive search gives the
+# same answers as a case-sensitive one.
+SKIP_PREFIX_PATTERNS = [pattern for pattern in SKIP_PATTERNS if pattern.startswith("^")]
+SKIP_ANYWHERE_PATTERNS = [pattern for pattern in SKIP_PATTERNS if not pattern.startswith("^")]
+SKIP_PREFIX_RE = _alternation(SKIP_PREFIX_PATTERNS)
+SKIP_ANYWHERE_RE = _alternation(SKIP_ANYWHERE_PATTERNS)
+SKIP_RE = _alternation(SKIP_PATTERNS, re.I)
+PROGRAM_RE = _alternation(PROGRAM_PATTERNS, re.I)
+YEAR_RE = re.compile(r"\d{4}")
+PROGRAM_DIV_CLASS = re.compile(r"course|program|subject", re.I)
+COURSE_WORDS = ("science", "engineering", "technology", "management", "studies", "education", "medicine", "law", "arts")
+
 
 class ProgramScraper:
     """Scraper for programs from MySchoolGist course pages"""
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 8, per_host_concurrency: int = 1, max_page_bytes: int = MAX_PAGE_BYTES):
         self.base_url = "https://myschoolgist.com"
         self.rate_limit_delay = 2.0
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
+        self.max_page_bytes = max_page_bytes
+        self.http = http_client
+        self.metrics = FetchMetrics(type(self).__name__)
+        self.async_fetcher = AsyncFetcher(
+            self.fetch,
+            max_concurrency=max_concurrency,
+            per_host_concurrency=per_host_concurrency,
+        )
     
     def fetch(self, url: str) -> Optional[requests.Response]:
-        """Fetch a URL with rate limiting"""
-        try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return response
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
+        """Fetch an HTML page through the shared HTTP client, skipping oversized or non-HTML responses"""
+        return self.http.fetch(
+            url,
+            min_interval=self.rate_limit_delay,
+            metrics=self.metrics,
+            max_bytes=self.max_page_bytes,
+            allowed_content_types=HTML_CONTENT_TYPES,
+        )
+
+    async def afetch(self, url: str) -> Optional[requests.Response]:
+        """Fetch a URL asynchronously, capped per host"""
+        return await self.async_fetcher.fetch(url)
 
     def scrape_programs_from_url(self, courses_url: str, institution_name: str, institution_id: str) -> List[Dict]:
         """Scrape programs from a courses URL"""
@@ -45,56 +136,52 @@ class ProgramScraper:
             logger.warning(f"Could not fetch courses URL: {courses_url}")
             return []
 
-        soup = BeautifulSoup(response.content, "html.parser")
-        programs = []
-
-        # Try multiple patterns to find program lists
-        # Pattern 1: List items
-        list_items = soup.find_all("li")
-        for item in list_items:
-            text = item.get_text(strip=True)
-            if self._is_program_name(text):
-                program = self._extract_program_info(text, institution_name, institution_id, courses_url, soup)
-                if program:
-                    programs.append(program)
-
-        # Pattern 2: Table rows
-        tables = soup.find_all("table")
-        for table in tables:
-            rows = table.find_all("tr")[1:]  # Skip header
-            for row in rows:
-                cells = row.find_all(["td", "th"])
-                if len(cells) >= 1:
-                    text = cells[0].get_text(strip=True)
-                    if self._is_program_name(text):
-                        program = self._extract_program_info(text, institution_name, institution_id, courses_url, soup)
-                        if program:
-                            programs.append(program)
-
-        # Pattern 3: Divs with program names
-        divs = soup.find_all("div", class_=re.compile(r"course|program|subject", re.I))
-        for div in divs:
-            text = div.get_text(strip=True)
-            if self._is_program_name(text):
-                program = self._extract_program_info(text, institution_name, institution_id, courses_url, soup)
-                if program:
-                    programs.append(program)
-
-        # Pattern 4: Paragraphs with program names
-        paragraphs = soup.find_all("p")
-        for p in paragraphs:
-            text = p.get_text(strip=True)
-            if self._is_program_name(text) and len(text) < 200:  # Avoid long paragraphs
-                program = self._extract_program_info(text, institution_name, institution_id, courses_url, soup)
-                if program:
-                    programs.append(program)
-
-        # Deduplicate by name
-        seen = set()
+        return self.parse_programs_page(response, courses_url, institution_name, institution_id)
+
+    async def ascrape_programs_from_url(
+        self, courses_url: str, institution_name: str, institution_id: str
+    ) -> List[Dict]:
+        """Scrape programs from a courses URL without blocking the event loop"""
+        if not courses_url:
+            return []
+
+        # Parsed in the parse pool when it is enabled
+        programs = await parse_pool.fetch_and_parse(
+            self, courses_url, "parse_programs_page", courses_url, institution_name, institution_id
+        )
+        if programs is None:
+            logger.warning(f"Could not fetch courses URL: {courses_url}")
+            return []
+
+        return programs
+
+    def parse_programs_page(
+        self, response: requests.Response, courses_url: str, institution_name: str, institution_id: str
+    ) -> List[Dict]:
+        """Parse programs from a fetched courses page"""
+        soup = make_soup(response_html(response))
+        page = PageContext(soup)
         unique_programs = []
-        for program in programs:
-            name_key = program["name"].lower().strip()
-            if name_key not in seen:
+        seen = set()
+        classified: Dict[str, bool] = {}
+
+        # List items, table rows, program divs and paragraphs, in that order,
+        # from a single walk of the page
+        for origin, text in candidate_texts(soup, PROGRAM_DIV_CLASS):
+            is_program = classified.get(text)
+            if is_program is None:
+                is_program = classified[text] = self._is_program_name(text)
+            if not is_program:
+                continue
+            if origin == PARAGRAPH and len(text) >= 200:  # Avoid long paragraphs
+                continue
+
+            # Deduplicate by name before doing any extraction work
+            name_key = text.strip().lower().strip()
+            if name_key in seen:
+                continue
+            program = self._extract_program_info(text, institution_name, institution_id, courses_url, page)
+            if program:
                 seen.add(name_key)
                 unique_programs.append(program)
 
@@ -107,81 +194,30 @@ class ProgramScraper:
             return False
 
         text_lower = text.lower().strip()
-        
-        # Skip common non-program text (announcements, headers, etc.)
-        skip_patterns = [
-            r"^(s/n|no\.|number|name|program|course|faculty|department)",
-            r"^(click|read|view|see|more|less)",
-            r"^(admission|requirement|cutoff|jamb|utme)",
-            r"^(\d+)$",  # Just numbers
-            r"\d{4}[/-]\d{4}",  # Years like 2020/2021 (announcements)
-            r"admission\s+into",  # Admission announcements
-            r"screening\s+examination",  # Exam announcements
-            r"list\s+of",  # List headers
-            r"final\s+list",  # Admission lists
-            r"second\s+list|third\s+list|fourth\s+list",  # Multiple lists
-            r"according\s+to",  # Rankings/statements
-            r"times\s+higher\s+education",  # Rankings
-            r"world\s+university\s+ranking",  # Rankings
-            r"centre\s+of\s+excellence|center\s+of\s+excellence",  # Research centers (not programs)
-            r"facts\s+and\s+figures",  # Information pages
-            r"^history,?\s*",  # History pages
-            r"call\s+for\s+papers",  # Journal calls
-            r"byadmin|bypublication",  # News articles
-            r"journal\s+of",  # Journal names
-            r"volume\s+\d+|issue\s+\d+",  # Journal volumes/issues
-            r"campus\s+life",  # Campus information
-            r"official\s+news",  # News articles
-            r"^(college|centre|center|institute|school)\s+(of|for)\s+",  # Institution names (not programs)
-            r"campuses",  # Campus listings
-            r"©\s+\d{4}",  # Copyright notices
-            r"all\s+rights\s+reserved",  # Copyright text
-            r"designed\s+by",  # Footer text
-            r"^(dean|director|professor|dr\.|prof\.)\s+",  # Titles/positions
-            r"student$",  # "Computer Science Student" etc
-            r"^adeyemi\s+college",  # Institution names
-            r"^africa\s+centre",  # Research centers
-            r"^ace\s+",  # Centers of excellence
-            r"international\s+conference",  # Conference announcements
-            r"^about",  # About pages
-            r"philosophy|objectives|vision|mission",  # Institution info pages
-            r"sensitises|staff",  # News articles
-            r"centre\s+for\s+information",  # IT centers
-            r"applied\s+research\s+&\s+technology",  # Research centers
-        ]
-
-        for pattern in skip_patterns:
-            if re.search(pattern, text_lower, re.I):
-                return False
-
-        # Must contain actual program/course keywords
-        program_patterns = [
-            r"\b(B\.?Sc|B\.?A|B\.?Eng|B\.?Tech|B\.?Ed|LL\.?B|MBBS|B\.?Pharm|B\.?Agric|B\.?Arch|B\.?Vet|ND|HND|NCE|OND)\b",
-            r"\b(Computer Science|Engineering|Medicine|Law|Pharmacy|Agriculture|Architecture|Education)\b",
-            r"\b(Accounting|Business|Economics|Mass Communication|Political Science|Sociology|Psychology)\b",
-            r"\b(Mathematics|Physics|Chemistry|Biology|Geography|History|Literature|English)\b",
-            r"\b(Mechanical|Electrical|Civil|Chemical|Petroleum|Aerospace)\s+Engineering\b",
-            r"\b(Software|Information|Data)\s+(Engineering|Science|Technology)\b",
-            r"\b(Public|International|Business)\s+(Administration|Relations)\b",
-            r"\b(Environmental|Marine|Food)\s+(Science|Engineering|Technology)\b",
-        ]
+
+        if text_lower.isascii():
+            skip = SKIP_PREFIX_RE.match(text_lower) or SKIP_ANYWHERE_RE.search(text_lower)
+        else:
+            skip = SKIP_RE.search(text_lower)
+        if skip:
+            return False
 
         # Must match at least one program pattern
-        has_program_keyword = any(re.search(p, text, re.I) for p in program_patterns)
+        has_program_keyword = PROGRAM_RE.search(text) is not None
         
         # Also check if it's a standalone course name (not an announcement)
         is_standalone_course = (
             len(text.split()) <= 6 and  # Short enough to be a course name
-            not re.search(r"\d{4}", text) and  # No years
+            not YEAR_RE.search(text) and  # No years
             not text_lower.startswith("admission") and  # Not admission announcements
             not text_lower.startswith("screening") and  # Not exam announcements
-            any(word in text_lower for word in ["science", "engineering", "technology", "management", "studies", "education", "medicine", "law", "arts"])
+            any(word in text_lower for word in COURSE_WORDS)
         )
         
         return has_program_keyword or is_standalone_course
 
     def _extract_program_info(
-        self, program_text: str, institution_name: str, institution_id: str, source_url: str, soup: BeautifulSoup
+        self, program_text: str, institution_name: str, institution_id: str, source_url: str, page: PageContext
     ) -> Optional[Dict]:
         """Extract program information from text and page context"""
         # Clean program name
@@ -191,19 +227,19 @@ class ProgramScraper:
         degree_type = self._extract_degree_type(name)
 
         # Extract UTME subjects (common patterns)
-        utme_subjects = self._extract_utme_subjects(name, soup)
+        utme_subjects = self._extract_utme_subjects(name, page)
 
         # Extract O-level subjects
-        olevel_subjects = self._extract_olevel_subjects(name, soup)
+        olevel_subjects = self._extract_olevel_subjects(name, page)
 
         # Extract duration
-        duration = self._extract_duration(name, soup)
+        duration = self._extract_duration(name, page)
 
         # Extract description
-        description = self._extract_description(name, soup)
+        description = self._extract_description(name, page)
 
         # Extract admission requirements
-        admission_requirements = self._extract_admission_requirements(name, soup)
+        admission_requirements = self._extract_admission_requirements(name, page)
 
         program = {
             "name": name,
@@ -247,117 +283,33 @@ class ProgramScraper:
 
         return None
 
-    def _extract_utme_subjects(self, text: str, soup: BeautifulSoup) -> List[str]:
+    def _extract_utme_subjects(self, text: str, page: PageContext) -> List[str]:
         """Extract required UTME subjects"""
-        subjects = []
-        
-        common_subjects = [
-            "Mathematics", "English", "Physics", "Chemistry", "Biology",
-            "Economics", "Government", "Literature", "Geography", "History",
-            "Commerce", "Accounting", "Agricultural Science", "CRS", "IRS",
-        ]
-
         # Look for subject mentions in text
         text_lower = text.lower()
-        for subject in common_subjects:
-            if subject.lower() in text_lower:
-                subjects.append(subject)
-
-        # Look for subject combinations in page
-        page_text = soup.get_text()
-        subject_patterns = [
-            r"UTME\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"JAMB\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"Required\s+subjects?[:\s]+([A-Za-z,\s]+)",
-        ]
-
-        for pattern in subject_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                found_subjects = [s.strip() for s in match.group(1).split(",")]
-                subjects.extend([s for s in found_subjects if s in common_subjects])
+        subjects = [subject for subject in COMMON_SUBJECTS if subject.lower() in text_lower]
+
+        # Add subject combinations listed on the page
+        subjects.extend(page.utme_subjects)
 
         return list(set(subjects))  # Remove duplicates
 
-    def _extract_olevel_subjects(self, text: str, soup: BeautifulSoup) -> List[str]:
+    def _extract_olevel_subjects(self, text: str, page: PageContext) -> List[str]:
         """Extract required O-level subjects"""
-        subjects = []
-        
-        common_subjects = [
-            "Mathematics", "English", "Physics", "Chemistry", "Biology",
-            "Economics", "Government", "Literature", "Geography", "History",
-            "Commerce", "Accounting", "Agricultural Science", "CRS", "IRS",
-        ]
-
-        page_text = soup.get_text()
-        olevel_patterns = [
-            r"O['\s]?level\s+subjects?[:\s]+([A-Za-z,\s]+)",
-            r"O['\s]?level\s+requirements?[:\s]+([A-Za-z,\s]+)",
-            r"WAEC\s+subjects?[:\s]+([A-Za-z,\s]+)",
-        ]
-
-        for pattern in olevel_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                found_subjects = [s.strip() for s in match.group(1).split(",")]
-                subjects.extend([s for s in found_subjects if s in common_subjects])
-
-        return list(set(subjects))
-
-    def _extract_duration(self, text: str, soup: BeautifulSoup) -> Optional[str]:
-        """Extract program duration"""
-        duration_patterns = [
-            r"(\d+)\s*years?",
-            r"Duration[:\s]+(\d+)\s*years?",
-            r"(\d+)\s*year\s+program",
-        ]
-
-        page_text = soup.get_text()
-        for pattern in duration_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                years = match.group(1)
-                return f"{years} years"
+        return list(set(page.olevel_subjects))
 
-        return None
+    def _extract_duration(self, text: str, page: PageContext) -> Optional[str]:
+        """Extract program duration"""
+        return page.duration
 
-    def _extract_admission_requirements(self, text: str, soup: BeautifulSoup) -> Optional[Dict]:
+    def _extract_admission_requirements(self, text: str, page: PageContext) -> Optional[Dict]:
         """Extract admission requirements"""
-        requirements = {}
-
-        page_text = soup.get_text()
-
-        # Extract JAMB score requirement
-        jamb_patterns = [
-            r"JAMB\s+score[:\s]+(\d+)",
-            r"UTME\s+score[:\s]+(\d+)",
-            r"minimum\s+(\d+)\s+in\s+JAMB",
-        ]
-
-        for pattern in jamb_patterns:
-            match = re.search(pattern, page_text, re.I)
-            if match:
-                requirements["jamb_score"] = int(match.group(1))
-                break
+        requirements = page.admission_requirements
+        return dict(requirements) if requirements else None
 
-        # Extract O-level requirements
-        olevel_pattern = r"O['\s]?level[:\s]+([A-Z0-9,\s]+)"
-        match = re.search(olevel_pattern, page_text, re.I)
-        if match:
-            requirements["olevel_requirements"] = match.group(1).strip()
-
-        return requirements if requirements else None
-
-    def _extract_description(self, text: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_description(self, text: str, page: PageContext) -> Optional[str]:
         """Extract program description"""
-        # Look for description paragraphs
-        paragraphs = soup.find_all("p")
-        for p in paragraphs:
-            p_text = p.get_text(strip=True)
-            if len(p_text) > 50 and any(word in p_text.lower() for word in ["program", "course", "study", "degree"]):
-                return p_text[:500]  # Limit to 500 chars
-
-        return None
+        return page.description
 
 
 if __name__ == "__main__":
@@ -9,14 +9,43 @@ Scrapes institutions from myschoolgist.com including:
 - Polytechnics
 - Colleges of education
 """
+import asyncio
 import logging
 import re
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from typing import Dict, Iterator, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from scrapers.shared.async_fetch import iter_completed
 from scrapers.shared.base_scraper import BaseScraper
+from scrapers.shared.gazetteer import locate, state_named
+from scrapers.shared.html import make_fast_tree, make_region_soup, make_soup, response_html
+from scrapers.shared.parse_pool import parse_pool
 
 logger = logging.getLogger(__name__)
 
+# Institution list pages only need their table
+LIST_REGION = SoupStrainer("table")
+
+# Divs holding institution names on pages without a table
+ALT_DIV_CLASS = re.compile(r"institution|university|school", re.I)
+
+# Institution list pages, by institution type
+INSTITUTION_URLS = {
+    "private": "https://myschoolgist.com/ng/private-universities-in-nigeria/",
+    "federal": "https://myschoolgist.com/ng/federal-universities-in-nigeria/",
+    "state": "https://myschoolgist.com/ng/state-universities-in-nigeria/",
+    "polytechnic": "https://myschoolgist.com/ng/list-of-accredited-polytechnics-in-nigeria/",
+    "college_education": "https://myschoolgist.com/ng/list-of-accredited-colleges-of-education-in-nigeria/",
+    "nursing": "https://myschoolgist.com/ng/list-of-schools-of-nursing-in-nigeria/",
+    "teaching_hospital": "https://myschoolgist.com/ng/list-of-teaching-hospitals-in-nigeria/",
+}
+
+# Places the gazetteer does not know, named after "in", "at" or a comma
+CITY_PATTERNS = [
+    re.compile(r"in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.I),
+    re.compile(r",\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.I),
+    re.compile(r"at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.I),
+]
+
 
 class MySchoolGistScraper(BaseScraper):
     """Scraper for MySchoolGist portal"""
@@ -30,46 +59,64 @@ class MySchoolGistScraper(BaseScraper):
 
     def scrape_institutions(self) -> List[Dict]:
         """Scrape institutions from MySchoolGist"""
-        logger.info("Scraping institutions from MySchoolGist...")
-        institutions = []
-
-        # Scrape different institution types
-        institution_urls = {
-            "private": "https://myschoolgist.com/ng/private-universities-in-nigeria/",
-            "federal": "https://myschoolgist.com/ng/federal-universities-in-nigeria/",
-            "state": "https://myschoolgist.com/ng/state-universities-in-nigeria/",
-            "polytechnic": "https://myschoolgist.com/ng/list-of-accredited-polytechnics-in-nigeria/",
-            "college_education": "https://myschoolgist.com/ng/list-of-accredited-colleges-of-education-in-nigeria/",
-            "nursing": "https://myschoolgist.com/ng/list-of-schools-of-nursing-in-nigeria/",
-            "teaching_hospital": "https://myschoolgist.com/ng/list-of-teaching-hospitals-in-nigeria/",
-        }
+        return asyncio.run(self.ascrape_institutions())
 
-        for inst_type, url in institution_urls.items():
-            try:
-                logger.info(f"Scraping {inst_type} institutions from {url}")
-                scraped = self._scrape_institution_list(url, inst_type)
-                institutions.extend(scraped)
-                logger.info(f"Scraped {len(scraped)} {inst_type} institutions")
-            except Exception as e:
-                logger.error(f"Error scraping {inst_type} institutions: {e}")
+    async def ascrape_institutions(self) -> List[Dict]:
+        """Scrape institutions from MySchoolGist, fetching list pages concurrently"""
+        logger.info("Scraping institutions from MySchoolGist...")
+        pages = await asyncio.gather(
+            *(self._ascrape_list(inst_type, url) for inst_type, url in INSTITUTION_URLS.items())
+        )
+        return [institution for page in pages for institution in page]
 
+    def iter_institutions(self) -> Iterator[Dict]:
+        """Yield institutions from each list page as soon as it is parsed"""
+        logger.info("Scraping institutions from MySchoolGist...")
+        pages = iter_completed(self._ascrape_list(inst_type, url) for inst_type, url in INSTITUTION_URLS.items())
+        for page in pages:
+            yield from page
+
+    async def _ascrape_list(self, inst_type: str, url: str) -> List[Dict]:
+        """Fetch and parse a list page, in the parse pool when it is enabled"""
+        institutions = await parse_pool.fetch_and_parse(self, url, "_parse_list_response", url, inst_type)
+        if institutions is None:
+            return self._parse_list_response(None, url, inst_type)
         return institutions
 
+    def _parse_list_response(self, response, url: str, inst_type: str) -> List[Dict]:
+        """Parse a fetched list page, logging instead of raising on errors"""
+        try:
+            logger.info(f"Scraping {inst_type} institutions from {url}")
+            scraped = self._parse_institution_list(response, url, inst_type) if response else []
+            logger.info(f"Scraped {len(scraped)} {inst_type} institutions")
+            return scraped
+        except Exception as e:
+            logger.error(f"Error scraping {inst_type} institutions: {e}")
+            return []
+
     def _scrape_institution_list(self, url: str, inst_type: str) -> List[Dict]:
         """Scrape institution list from a specific URL"""
         response = self.fetch(url)
         if not response:
             return []
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        return self._parse_institution_list(response, url, inst_type)
+
+    def _parse_institution_list(self, response, url: str, inst_type: str) -> List[Dict]:
+        """Parse an institution list page"""
         institutions = []
 
-        # Find table with institution data
-        table = soup.find("table")
+        # Find table with institution data, through the fast parser if enabled
+        tree = make_fast_tree(response_html(response))
+        table = tree.find("table") if tree else None
         if not table:
-            # Try alternative structure (divs, lists, etc.)
-            institutions = self._scrape_alternative_structure(soup, inst_type)
-            return institutions
+            # Falls back to the whole page when there is no table
+            soup = make_region_soup(response_html(response), LIST_REGION)
+            table = soup.find("table")
+            if not table:
+                # Try alternative structure (divs, lists, etc.)
+                institutions = self._scrape_alternative_structure(soup, inst_type)
+                return institutions
 
         # Extract table rows
         rows = table.find_all("tr")[1:]  # Skip header row
@@ -175,79 +222,69 @@ class MySchoolGistScraper(BaseScraper):
         """Scrape from alternative HTML structures (lists, divs, etc.)"""
         institutions = []
 
-        # Try to find list items or divs with institution names
-        # Look for common patterns
-        patterns = [
-            soup.find_all("li"),
-            soup.find_all("div", class_=re.compile(r"institution|university|school", re.I)),
-            soup.select("article ul li"),
-            soup.select("main ul li"),
-        ]
+        # The same for every institution on the page
+        canonical_link = soup.find("link", rel="canonical")
+        source_url = str(canonical_link.get("href", "")) if canonical_link else ""
+        institution_type = self._determine_type(inst_type)
+        ownership = self._determine_ownership(inst_type)
 
-        for pattern_list in patterns:
-            for element in pattern_list:
-                text = element.get_text(strip=True)
-                if not text or len(text) < 5:
-                    continue
-
-                # Check if it looks like an institution name
-                if self._looks_like_institution_name(text):
-                    location = self._extract_location_from_name(text)
-                    canonical_link = soup.find("link", rel="canonical")
-                    source_url = str(canonical_link.get("href", "")) if canonical_link else ""
-                    
-                    institution = {
-                        "name": text,
-                        "type": self._determine_type(inst_type),
-                        "ownership": self._determine_ownership(inst_type),
-                        "state": location.get("state", ""),
-                        "city": location.get("city", ""),
-                        "website": None,
-                        "contact": {},
-                        "accreditationStatus": "accredited",  # Matches API schema
-                        "source_url": source_url,
-                        "license": "CC-BY-NC-SA",
-                    }
-                    institutions.append(institution)
+        for element in self._alternative_candidates(soup):
+            text = element.get_text(strip=True)
+            if not text or len(text) < 5:
+                continue
+
+            # Check if it looks like an institution name
+            if self._looks_like_institution_name(text):
+                location = self._extract_location_from_name(text)
+                institution = {
+                    "name": text,
+                    "type": institution_type,
+                    "ownership": ownership,
+                    "state": location.get("state", ""),
+                    "city": location.get("city", ""),
+                    "website": None,
+                    "contact": {},
+                    "accreditationStatus": "accredited",  # Matches API schema
+                    "source_url": source_url,
+                    "license": "CC-BY-NC-SA",
+                }
+                institutions.append(institution)
 
         return institutions
 
-    def _extract_location_from_name(self, name: str) -> Dict[str, str]:
-        """Extract state and city from institution name"""
-        # Nigerian states list
-        states = [
-            "Abia", "Adamawa", "Akwa Ibom", "Anambra", "Bauchi", "Bayelsa",
-            "Benue", "Borno", "Cross River", "Delta", "Ebonyi", "Edo",
-            "Ekiti", "Enugu", "FCT", "Gombe", "Imo", "Jigawa", "Kaduna",
-            "Kano", "Katsina", "Kebbi", "Kogi", "Kwara", "Lagos", "Nasarawa",
-            "Niger", "Ogun", "Ondo", "Osun", "Oyo", "Plateau", "Rivers",
-            "Sokoto", "Taraba", "Yobe", "Zamfara", "Abuja"
-        ]
+    def _alternative_candidates(self, soup: BeautifulSoup) -> Iterator[Tag]:
+        """Yield every list item, then every institution div, once each
 
-        state = ""
-        city = ""
+        List items under article or main are among all list items, so each
+        element is visited by a single walk of the page instead of once per
+        query that matches it.
+        """
+        divs = []
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            if element.name == "li":
+                yield element
+            elif element.name == "div" and any(ALT_DIV_CLASS.search(c) for c in element.get("class") or ()):
+                divs.append(element)
+        yield from divs
 
-        # Try to find state in name
-        for s in states:
-            if s.lower() in name.lower():
-                state = s
-                break
+    def _extract_location_from_name(self, name: str) -> Dict[str, str]:
+        """Extract state and city from institution name"""
+        location = locate(name)
+        state = location.state or ""
+        city = location.city or ""
 
         # Extract city (usually before comma or after "in")
-        city_patterns = [
-            r"in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r",\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"at\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-        ]
-
-        for pattern in city_patterns:
-            match = re.search(pattern, name, re.I)
-            if match:
-                potential_city = match.group(1).strip()
-                # Don't use state name as city
-                if potential_city not in states:
-                    city = potential_city
-                    break
+        if not city:
+            for pattern in CITY_PATTERNS:
+                match = pattern.search(name)
+                if match:
+                    potential_city = match.group(1).strip()
+                    # Don't use state name as city
+                    if not state_named(potential_city):
+                        city = potential_city
+                        break
 
         return {"state": state, "city": city}
 
@@ -295,21 +332,30 @@ class MySchoolGistScraper(BaseScraper):
 
     def scrape_programs(self, institution_id: Optional[str] = None) -> List[Dict]:
         """Scrape programs from MySchoolGist"""
+        return asyncio.run(self.ascrape_programs(institution_id))
+
+    async def ascrape_programs(self, institution_id: Optional[str] = None) -> List[Dict]:
+        """Scrape programs from MySchoolGist, fetching course pages concurrently"""
         logger.info("Scraping programs from MySchoolGist...")
         programs = []
 
         # First, get institutions to find their course pages
-        institutions = self.scrape_institutions()
+        institutions = await self.ascrape_institutions()
+        institutions = [
+            institution for institution in institutions[:10]  # Limit for testing
+            if institution.get("courses_url")
+        ]
 
-        for institution in institutions[:10]:  # Limit for testing
-            courses_url = institution.get("courses_url")
-            if not courses_url:
+        responses = await self.afetch_all(inst["courses_url"] for inst in institutions)
+
+        for institution, response in zip(institutions, responses):
+            if not response:
                 continue
 
             try:
                 logger.info(f"Scraping programs for {institution['name']}")
-                institution_programs = self._scrape_programs_from_url(
-                    courses_url, institution.get("name", "")
+                institution_programs = self._parse_programs_page(
+                    response, institution["courses_url"], institution.get("name", "")
                 )
                 programs.extend(institution_programs)
             except Exception as e:
@@ -323,7 +369,11 @@ class MySchoolGistScraper(BaseScraper):
         if not response:
             return []
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        return self._parse_programs_page(response, url, institution_name)
+
+    def _parse_programs_page(self, response, url: str, institution_name: str) -> List[Dict]:
+        """Parse programs from an institution's courses page"""
+        soup = make_soup(response_html(response))
         programs = []
 
         # Find program lists (could be in various formats)
@@ -5,11 +5,16 @@ Scrapes polytechnics from various sources
 import logging
 import re
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from scrapers.shared.base_scraper import BaseScraper
+from scrapers.shared.gazetteer import locate, state_named
+from scrapers.shared.html import make_region_soup, make_soup, response_html
 
 logger = logging.getLogger(__name__)
 
+# The headings and lists are in the WordPress post body
+POST_REGION = SoupStrainer(["article", "main"])
+
 
 class NBTEScraper(BaseScraper):
     """Scraper for NBTE accredited polytechnics"""
@@ -35,8 +40,11 @@ class NBTEScraper(BaseScraper):
             return institutions
 
         try:
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = make_region_soup(response_html(response), POST_REGION, required="h2")
             institutions = self._parse_polytechnics_page(soup, url)
+            if not institutions:
+                # The lists may be outside the post body, try the whole page
+                institutions = self._parse_polytechnics_page(make_soup(response_html(response)), url)
             logger.info(f"Scraped {len(institutions)} polytechnics from MySchoolGist")
         except Exception as e:
             logger.error(f"Error parsing polytechnics page: {e}")
@@ -106,46 +114,20 @@ class NBTEScraper(BaseScraper):
 
     def _extract_location_from_name(self, name: str) -> tuple[str, str]:
         """Extract state and city from polytechnic name"""
-        state = "Unknown"
-        city = "Unknown"
+        location = locate(name)
+        state = location.state or "Unknown"
+        city = location.city or "Unknown"
 
         # Common patterns: "Polytechnic, City" or "Polytechnic, City, State"
-        # Or "State Polytechnic, City"
-        if "," in name:
+        if location.city is None and "," in name:
             parts = [p.strip() for p in name.split(",")]
-            if len(parts) >= 2:
-                city = parts[-1].strip()
-                # If last part looks like a state, use it
-                if city in self._get_nigerian_states():
-                    state = city
-                    city = parts[-2].strip() if len(parts) > 2 else "Unknown"
-                else:
-                    # Try to find state in name
-                    for part in parts:
-                        if part in self._get_nigerian_states():
-                            state = part
-                            break
-
-        # Check if state is mentioned in name
-        states = self._get_nigerian_states()
-        for nigerian_state in states:
-            if nigerian_state.lower() in name.lower():
-                state = nigerian_state
-                break
+            city = parts[-1]
+            # If last part is the state, the city comes before it
+            if state_named(city):
+                city = parts[-2] if len(parts) > 2 else "Unknown"
 
         return state, city
 
-    def _get_nigerian_states(self) -> List[str]:
-        """Get list of Nigerian states"""
-        return [
-            "Abia", "Adamawa", "Akwa Ibom", "Anambra", "Bauchi", "Bayelsa",
-            "Benue", "Borno", "Cross River", "Delta", "Ebonyi", "Edo",
-            "Ekiti", "Enugu", "Gombe", "Imo", "Jigawa", "Kaduna", "Kano",
-            "Katsina", "Kebbi", "Kogi", "Kwara", "Lagos", "Nasarawa",
-            "Niger", "Ogun", "Ondo", "Osun", "Oyo", "Plateau", "Rivers",
-            "Sokoto", "Taraba", "Yobe", "Zamfara", "FCT", "Abuja",
-        ]
-
     def scrape_programs(self, institution_id: Optional[str] = None) -> List[Dict]:
         """Scrape programs from NBTE (not applicable for polytechnics)"""
         logger.info("NBTE scraper does not scrape programs")
@@ -5,11 +5,15 @@ Scrapes accredited colleges of education from https://ncce.gov.ng/AccreditedColl
 import logging
 import re
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from scrapers.shared.base_scraper import BaseScraper
+from scrapers.shared.html import make_region_soup, response_html
 
 logger = logging.getLogger(__name__)
 
+# Only the colleges table is parsed
+TABLE_REGION = SoupStrainer("table")
+
 
 class NCCEScraper(BaseScraper):
     """Scraper for NCCE accredited colleges of education"""
@@ -34,7 +38,7 @@ class NCCEScraper(BaseScraper):
             return institutions
 
         try:
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = make_region_soup(response_html(response), TABLE_REGION)
             institutions = self._parse_colleges_table(soup, url)
             logger.info(f"Scraped {len(institutions)} colleges of education from NCCE")
         except Exception as e:
@@ -3,13 +3,37 @@ NMCN (Nursing and Midwifery Council of Nigeria) Scraper
 Scrapes approved schools of nursing from official PDF
 """
 import logging
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Optional
-import requests
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 from scrapers.shared.base_scraper import BaseScraper
+from scrapers.shared.gazetteer import locate, state_named
+from scrapers.shared.pdf_cache import PdfPageCache
 
 logger = logging.getLogger(__name__)
 
+# Largest approved-schools PDF we are willing to download
+MAX_PDF_BYTES = int(os.getenv("NMCN_MAX_PDF_BYTES", str(50 * 1024 * 1024)))
+PDF_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream")
+
+# City names around "School of Nursing" when the gazetteer does not know the city
+CITY_PATTERNS = [
+    re.compile(r"School of Nursing[,\s]+([A-Z][a-z]+)"),
+    re.compile(r"([A-Z][a-z]+)\s+School of Nursing"),
+    re.compile(r"([A-Z][a-z]+)\s+Teaching Hospital"),
+]
+
+# Processes extracting PDF pages in parallel (0 = one per CPU core, 1 = no pool)
+PDF_WORKERS = int(os.getenv("NMCN_PDF_WORKERS", "0"))
+# Smaller PDFs are extracted in this process, starting a pool would cost more
+MIN_PARALLEL_PAGES = int(os.getenv("NMCN_MIN_PARALLEL_PAGES", "8"))
+
 try:
     import pdfplumber
     PDF_SUPPORT = True
@@ -17,16 +41,44 @@ except ImportError:
     PDF_SUPPORT = False
     logger.warning("pdfplumber not installed. Install with: pip install pdfplumber")
 
+# Page number, its text, and the error message if extraction failed
+PageText = Tuple[int, Optional[str], Optional[str]]
+
+
+def _iter_page_texts(pdf, indexes: List[int]) -> Iterator[PageText]:
+    """Extract the text of the given pages, keeping a failed page from stopping the rest"""
+    for index in indexes:
+        try:
+            yield index + 1, pdf.pages[index].extract_text(), None
+        except Exception as e:
+            yield index + 1, None, str(e)
+
+
+def _extract_pages(path: str, indexes: List[int]) -> List[PageText]:
+    """Extract the text of the given pages in a worker process, opening the PDF independently"""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return list(_iter_page_texts(pdf, indexes))
+
 
 class NMCNScraper(BaseScraper):
     """Scraper for NMCN approved schools of nursing"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_pdf_bytes: int = MAX_PDF_BYTES,
+        pdf_workers: int = PDF_WORKERS,
+        page_cache: Optional[PdfPageCache] = None,
+    ):
         super().__init__(
             base_url="https://nmcn.gov.ng",
             rate_limit_delay=2.0,
             respect_robots=True,
         )
+        self.max_pdf_bytes = max_pdf_bytes
+        self.pdf_workers = pdf_workers
+        self.page_cache = page_cache or PdfPageCache()
 
     def scrape_institutions(self) -> List[Dict]:
         """Scrape approved schools of nursing from NMCN PDF"""
@@ -41,13 +93,19 @@ class NMCNScraper(BaseScraper):
         pdf_url = "https://nmcn.gov.ng/wp-content/uploads/2025/07/New_List_of_Approved_Schools_2025.pdf"
         
         try:
-            response = self.fetch(pdf_url)
-            if not response:
+            # Stream to a spooled temp file instead of holding the PDF in memory
+            pdf_file = self.download(
+                pdf_url,
+                max_bytes=self.max_pdf_bytes,
+                allowed_content_types=PDF_CONTENT_TYPES,
+            )
+            if not pdf_file:
                 logger.error(f"Failed to fetch PDF from {pdf_url}")
                 return institutions
 
             # Parse PDF
-            institutions = self._parse_pdf(response.content, pdf_url)
+            with pdf_file:
+                institutions = self._parse_pdf(pdf_file, pdf_url)
             logger.info(f"Scraped {len(institutions)} approved schools of nursing from NMCN PDF")
         except Exception as e:
             logger.error(f"Error parsing NMCN PDF: {e}", exc_info=True)
@@ -55,21 +113,30 @@ class NMCNScraper(BaseScraper):
 
         return institutions
 
-    def _parse_pdf(self, pdf_content: bytes, source_url: str) -> List[Dict]:
-        """Parse PDF content to extract approved schools"""
+    def _parse_pdf(self, pdf_file: BinaryIO, source_url: str) -> List[Dict]:
+        """Parse a PDF file to extract approved schools"""
         institutions = []
 
+        # Reject HTML error pages and other non-PDF bodies before pdfplumber sees them
+        if not pdf_file.read(5).startswith(b"%PDF-"):
+            logger.error(f"Response from {source_url} is not a PDF")
+            return institutions
+        pdf_file.seek(0)
+
         try:
-            import io
             import pdfplumber
 
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        text = page.extract_text()
-                        if not text:
-                            continue
+            with pdfplumber.open(pdf_file) as pdf:
+                pages = self._page_texts(pdf, pdf_file)
+
+                for page_num, text, error in pages:
+                    if error:
+                        logger.warning(f"Error parsing page {page_num}: {error}")
+                        continue
+                    if not text:
+                        continue
 
+                    try:
                         # Extract schools from page text
                         page_schools = self._extract_schools_from_text(text, source_url, page_num)
                         institutions.extend(page_schools)
@@ -83,6 +150,64 @@ class NMCNScraper(BaseScraper):
 
         return institutions
 
+    def _page_texts(self, pdf, pdf_file: BinaryIO) -> List[PageText]:
+        """Get the text of every page, extracting only pages not in the page cache"""
+        page_count = len(pdf.pages)
+        keys = self.page_cache.keys(pdf)
+        pages: Dict[int, PageText] = {}
+        for index, key in keys.items():
+            text = self.page_cache.get(key)
+            if text is not None:
+                pages[index] = (index + 1, text, None)
+
+        missing = [index for index in range(page_count) if index not in pages]
+        if pages:
+            logger.info(f"{len(pages)} of {page_count} PDF pages unchanged, extracting {len(missing)}")
+
+        workers = self._pdf_workers(len(missing))
+        if workers > 1:
+            try:
+                extracted = self._extract_pages_parallel(pdf_file, missing, workers)
+            except BrokenProcessPool as e:
+                logger.warning(f"PDF worker pool failed ({e}), extracting pages serially")
+                extracted = _iter_page_texts(pdf, missing)
+        else:
+            extracted = _iter_page_texts(pdf, missing)
+
+        for page_num, text, error in extracted:
+            pages[page_num - 1] = (page_num, text, error)
+            # Failed pages are retried next time
+            if error is None and page_num - 1 in keys:
+                self.page_cache.store(keys[page_num - 1], text)
+
+        return [pages[index] for index in range(page_count)]
+
+    def _pdf_workers(self, page_count: int) -> int:
+        """Get how many processes to extract a PDF's pages with"""
+        if page_count < MIN_PARALLEL_PAGES:
+            return 1
+        workers = self.pdf_workers or os.cpu_count() or 1
+        return min(workers, page_count)
+
+    def _extract_pages_parallel(self, pdf_file: BinaryIO, indexes: List[int], workers: int) -> List[PageText]:
+        """Extract page texts with a pool of processes, one contiguous run of the pages each"""
+        bounds = [len(indexes) * shard // workers for shard in range(workers + 1)]
+        shards = [indexes[start:stop] for start, stop in zip(bounds, bounds[1:])]
+        logger.info(f"Extracting {len(indexes)} PDF pages with {workers} processes")
+
+        # Workers open the PDF themselves, so it needs a path on disk
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_copy:
+            pdf_file.seek(0)
+            shutil.copyfileobj(pdf_file, pdf_copy)
+            pdf_copy.flush()
+
+            # Spawn rather than fork: other scrapers may be running in threads of this process
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                results = executor.map(_extract_pages, repeat(pdf_copy.name), shards)
+                # map returns shards in submission order, so pages stay in order
+                return [page for shard in results for page in shard]
+
     def _extract_schools_from_text(self, text: str, source_url: str, page_num: int) -> List[Dict]:
         """Extract school names and details from PDF text"""
         institutions = []
@@ -156,44 +281,26 @@ class NMCNScraper(BaseScraper):
 
     def _extract_location_from_name(self, name: str) -> tuple[str, str]:
         """Extract state and city from school name"""
-        state = "Unknown"
-        city = "Unknown"
+        location = locate(name)
+        state = location.state or "Unknown"
+        city = location.city or "Unknown"
+        if location.city is not None:
+            return state, city
 
         # Common patterns: "School of Nursing, City" or "School of Nursing, City, State"
         if "," in name:
             parts = [p.strip() for p in name.split(",")]
-            if len(parts) >= 2:
-                city = parts[-1].strip()
-                # If last part looks like a state, use it
-                if city in self._get_nigerian_states():
-                    state = city
-                    city = parts[-2].strip() if len(parts) > 2 else "Unknown"
-                else:
-                    # Try to find state in name
-                    for part in parts:
-                        if part in self._get_nigerian_states():
-                            state = part
-                            break
-
-        # Check if state is mentioned in name
-        states = self._get_nigerian_states()
-        for nigerian_state in states:
-            if nigerian_state.lower() in name.lower():
-                state = nigerian_state
-                break
+            city = parts[-1]
+            # If last part is the state, the city comes before it
+            if state_named(city):
+                city = parts[-2] if len(parts) > 2 else "Unknown"
 
         # Try to extract city from common patterns
-        city_patterns = [
-            r"School of Nursing[,\s]+([A-Z][a-z]+)",
-            r"([A-Z][a-z]+)\s+School of Nursing",
-            r"([A-Z][a-z]+)\s+Teaching Hospital",
-        ]
-        
-        for pattern in city_patterns:
-            match = re.search(pattern, name)
+        for pattern in CITY_PATTERNS:
+            match = pattern.search(name)
             if match:
                 potential_city = match.group(1)
-                if potential_city not in states:
+                if not state_named(potential_city):
                     city = potential_city
                     break
 
@@ -213,17 +320,6 @@ class NMCNScraper(BaseScraper):
             # Default to state (most nursing schools are state-owned)
             return "state"
 
-    def _get_nigerian_states(self) -> List[str]:
-        """Get list of Nigerian states"""
-        return [
-            "Abia", "Adamawa", "Akwa Ibom", "Anambra", "Bauchi", "Bayelsa",
-            "Benue", "Borno", "Cross River", "Delta", "Ebonyi", "Edo",
-            "Ekiti", "Enugu", "Gombe", "Imo", "Jigawa", "Kaduna", "Kano",
-            "Katsina", "Kebbi", "Kogi", "Kwara", "Lagos", "Nasarawa",
-            "Niger", "Ogun", "Ondo", "Osun", "Oyo", "Plateau", "Rivers",
-            "Sokoto", "Taraba", "Yobe", "Zamfara", "FCT", "Abuja",
-        ]
-
     def scrape_programs(self, institution_id: Optional[str] = None) -> List[Dict]:
         """Scrape programs from NMCN (not applicable for nursing schools)"""
         logger.info("NMCN scraper does not scrape programs")
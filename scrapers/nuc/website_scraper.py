@@ -4,10 +4,10 @@ Scrapes institution websites from Nigerian Universities Commission (NUC) website
 """
 import logging
 import re
-import time
 import requests
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from typing import Dict, Optional
+from scrapers.shared.http_client import http_client
+from scrapers.shared.html import make_soup, response_html
 
 logger = logging.getLogger(__name__)
 
@@ -18,21 +18,14 @@ class NUCWebsiteScraper:
     def __init__(self):
         self.base_url = "https://www.nuc.edu.ng"
         self.rate_limit_delay = 2.0
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = http_client
+        self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
+        }
     
     def fetch(self, url: str) -> Optional[requests.Response]:
-        """Fetch a URL with rate limiting"""
-        try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return response
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
+        """Fetch a URL through the shared HTTP client"""
+        return self.http.fetch(url, min_interval=self.rate_limit_delay, headers=self.headers)
 
     def scrape_institution_websites(self) -> Dict[str, str]:
         """Scrape institution websites from NUC website"""
@@ -56,7 +49,7 @@ class NUCWebsiteScraper:
                 if not response:
                     continue
                 
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = make_soup(response_html(response))
                 
                 # Look for tables with institution information
                 tables = soup.find_all("table")
@@ -159,7 +152,7 @@ class NUCWebsiteScraper:
                 if not response:
                     continue
                 
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = make_soup(response_html(response))
                 
                 # Look for institution links
                 links = soup.find_all("a", href=True)
@@ -200,13 +193,9 @@ class NUCWebsiteScraper:
         
         # Check if any pattern is accessible
         for pattern in patterns:
-            try:
-                response = requests.head(pattern, timeout=5, allow_redirects=True)
-                if response.status_code == 200:
-                    logger.debug(f"Found website via pattern: {pattern}")
-                    return pattern
-            except:
-                continue
+            if self.http.probe(pattern, head_only=True):
+                logger.debug(f"Found website via pattern: {pattern}")
+                return pattern
         
         return None
 
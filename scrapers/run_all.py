@@ -1,86 +1,121 @@
 """
 Run all scrapers
+
+Sources live on different hosts and share no state, so they run concurrently
+in a thread pool. A failing source is logged and reported in the summary
+without stopping the others.
 """
 import logging
+import os
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Type
 from scrapers.nuc.scraper import NUCScraper
 from scrapers.myschool.scraper import MySchoolScraper
 from scrapers.myschoolgist.scraper import MySchoolGistScraper
 from scrapers.ncce.scraper import NCCEScraper
 from scrapers.nbte.scraper import NBTEScraper
+from scrapers.nmcn.scraper import NMCNScraper
+from scrapers.shared.base_scraper import BaseScraper
+from scrapers.shared.metrics import FetchMetrics, fetch_metrics
 
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    format="%(asctime)s - %(threadName)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
+SOURCES: Dict[str, Type[BaseScraper]] = {
+    "nuc": NUCScraper,
+    "myschool": MySchoolScraper,
+    "myschoolgist": MySchoolGistScraper,
+    "ncce": NCCEScraper,
+    "nbte": NBTEScraper,
+    "nmcn": NMCNScraper,
+}
+
+# Sources run at the same time (default: all of them)
+RUN_WORKERS = int(os.getenv("SCRAPER_RUN_WORKERS", str(len(SOURCES))))
+
+
+@dataclass
+class SourceResult:
+    """Outcome of running one source"""
+    source: str
+    institutions: int = 0
+    programs: int = 0
+    cutoffs: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+    metrics: Optional[FetchMetrics] = None
+
+
+def run_source(source: str, scraper_class: Type[BaseScraper]) -> SourceResult:
+    """Run one source, recording its failure instead of raising it"""
+    result = SourceResult(source)
+    start = time.monotonic()
+    try:
+        logger.info(f"Running {source} scraper...")
+        scraper = scraper_class()
+        result.metrics = scraper.metrics
+        result.institutions = len(scraper.scrape_institutions())
+    except Exception as e:
+        logger.error(f"{source} scraper failed: {e}", exc_info=True)
+        result.error = f"{type(e).__name__}: {e}"
+    result.duration = time.monotonic() - start
+    logger.info(f"Finished {source} scraper in {result.duration:.1f}s")
+    return result
+
+
+def run_sources(sources: Dict[str, Type[BaseScraper]], workers: int = RUN_WORKERS) -> List[SourceResult]:
+    """Run sources concurrently, returning their results in the order given"""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="source") as executor:
+        futures = [executor.submit(run_source, source, scraper_class) for source, scraper_class in sources.items()]
+        return [future.result() for future in futures]
+
 
 def main():
     """Run all scrapers"""
     logger.info("Starting scraper run...")
-    start_time = datetime.now()
+    start_time = time.monotonic()
 
-    results = {
-        "nuc": {"institutions": 0, "programs": 0, "cutoffs": 0},
-        "myschool": {"institutions": 0, "programs": 0, "cutoffs": 0},
-        "myschoolgist": {"institutions": 0, "programs": 0, "cutoffs": 0},
-        "ncce": {"institutions": 0, "programs": 0, "cutoffs": 0},
-        "nbte": {"institutions": 0, "programs": 0, "cutoffs": 0},
-    }
+    results = run_sources(SOURCES)
 
-    try:
-        # Run NUC scraper
-        logger.info("Running NUC scraper...")
-        nuc_scraper = NUCScraper()
-        nuc_institutions = nuc_scraper.scrape_institutions()
-        results["nuc"]["institutions"] = len(nuc_institutions)
-
-        # Run Myschool scraper
-        logger.info("Running Myschool scraper...")
-        myschool_scraper = MySchoolScraper()
-        myschool_institutions = myschool_scraper.scrape_institutions()
-        results["myschool"]["institutions"] = len(myschool_institutions)
-
-        # Run MySchoolGist scraper
-        logger.info("Running MySchoolGist scraper...")
-        myschoolgist_scraper = MySchoolGistScraper()
-        myschoolgist_institutions = myschoolgist_scraper.scrape_institutions()
-        results["myschoolgist"]["institutions"] = len(myschoolgist_institutions)
-
-        # Run NCCE scraper
-        logger.info("Running NCCE scraper...")
-        ncce_scraper = NCCEScraper()
-        ncce_institutions = ncce_scraper.scrape_institutions()
-        results["ncce"]["institutions"] = len(ncce_institutions)
-
-        # Run NBTE scraper
-        logger.info("Running NBTE scraper...")
-        nbte_scraper = NBTEScraper()
-        nbte_institutions = nbte_scraper.scrape_institutions()
-        results["nbte"]["institutions"] = len(nbte_institutions)
-
-    except Exception as e:
-        logger.error(f"Error running scrapers: {e}", exc_info=True)
-        sys.exit(1)
-
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
+    duration = time.monotonic() - start_time
+    failed = [result for result in results if result.error]
 
     logger.info("=" * 50)
     logger.info("Scraper Run Summary")
     logger.info("=" * 50)
-    for source, stats in results.items():
-        logger.info(f"{source.upper()}:")
-        logger.info(f"  Institutions: {stats['institutions']}")
-        logger.info(f"  Programs: {stats['programs']}")
-        logger.info(f"  Cutoffs: {stats['cutoffs']}")
-    logger.info(f"Total duration: {duration:.2f} seconds")
+    for result in results:
+        status = f"FAILED ({result.error})" if result.error else "ok"
+        logger.info(f"{result.source.upper()}: {status} in {result.duration:.1f}s")
+        logger.info(f"  Institutions: {result.institutions}")
+        logger.info(f"  Programs: {result.programs}")
+        logger.info(f"  Cutoffs: {result.cutoffs}")
+        if result.metrics:
+            logger.info("  Fetch metrics:")
+            result.metrics.log_summary(logger)
+    totals = fetch_metrics.totals()
+    logger.info(
+        f"Fetched {totals['requests']} URLs ({totals['errors']} errors, {totals['bytes'] / 1024 / 1024:.1f} MiB): "
+        f"{totals['sleep']:.1f}s rate-limited, {totals['dns']:.1f}s DNS, {totals['connect']:.1f}s connect, "
+        f"{totals['ttfb']:.1f}s waiting, {totals['download']:.1f}s downloading"
+    )
+    slowest = max(results, key=lambda result: result.duration)
+    logger.info(
+        f"Total duration: {duration:.2f} seconds "
+        f"(slowest source {slowest.source} {slowest.duration:.2f}s, "
+        f"sum of sources {sum(result.duration for result in results):.2f}s)"
+    )
     logger.info("=" * 50)
 
+    if failed:
+        logger.error(f"{len(failed)} of {len(results)} sources failed: {', '.join(r.source for r in failed)}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
-
-
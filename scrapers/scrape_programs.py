@@ -1,13 +1,30 @@
 """
 Script to scrape programs from institutions
 Uses the courses_url from institutions to scrape their programs
+
+Programs are imported as each institution finishes, streaming through
+validation, the JSON backup and batching into the import API.
+
+Progress is checkpointed per institution, so an interrupted run picks up where
+it stopped. A run after one that completed crawls everything again:
+
+    python -m scrapers.scrape_programs [api_url]                 # resume, or start a new crawl
+    python -m scrapers.scrape_programs [api_url] --retry-failed  # only retry failures
+    python -m scrapers.scrape_programs [api_url] --fresh         # start over
 """
+import argparse
+import asyncio
 import logging
-import json
 import sys
 import requests
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from scrapers.myschoolgist.scrape_programs import ProgramScraper
+from scrapers.shared.async_fetch import iter_async
+from scrapers.shared.crawl_state import DONE, FAILED, CrawlState
+from scrapers.shared.http_client import http_client
+from scrapers.shared.parse_pool import parse_pool
+from scrapers.shared.pipeline import import_records
+from scrapers.shared.scheduler import HostScheduler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,8 +36,7 @@ logger = logging.getLogger(__name__)
 def get_institutions_from_api(api_url: str = "http://localhost:3000") -> List[Dict]:
     """Get institutions from API that have courses_url"""
     try:
-        response = requests.get(f"{api_url}/api/institutions?limit=1000")
-        response.raise_for_status()
+        response = http_client.get(f"{api_url}/api/institutions?limit=1000", use_cache=False)
         data = response.json()
         institutions = data.get("data", [])
         
@@ -37,145 +53,254 @@ def get_institutions_from_api(api_url: str = "http://localhost:3000") -> List[Di
         return []
 
 
-def scrape_all_programs(api_url: str = "http://localhost:3000", limit_institutions: Optional[int] = None) -> List[Dict]:
+def scrape_all_programs(
+    api_url: str = "http://localhost:3000",
+    limit_institutions: Optional[int] = None,
+    state: Optional[CrawlState] = None,
+    retry_failed: bool = False,
+) -> List[Dict]:
     """Scrape programs from all institutions"""
-    scraper = ProgramScraper()
+    return asyncio.run(ascrape_all_programs(api_url, limit_institutions, state, retry_failed))
+
+
+def crawl_key(institution: Dict) -> str:
+    """Key an institution's crawl by its id and the URL scraped for it"""
+    return f"{institution.get('id')} {institution.get('courses_url') or institution.get('website')}"
+
+
+def select_institutions(
+    institutions: List[Dict],
+    state: Optional[CrawlState] = None,
+    retry_failed: bool = False,
+) -> List[Dict]:
+    """Pick the institutions a run has to crawl, given the saved crawl state
+
+    Only an interrupted crawl is resumed: if the last run got through every
+    institution, the saved progress is discarded and everything is crawled
+    again, so program data is refreshed on every scheduled run.
+    """
+    if not state:
+        return institutions
+    if not retry_failed and state.completed_at() is not None:
+        logger.info("Last crawl completed, starting a fresh one")
+        state.reset()
+    if retry_failed:
+        failed = state.keys(FAILED)
+        to_crawl = [inst for inst in institutions if crawl_key(inst) in failed]
+    else:
+        done = state.keys(DONE)
+        to_crawl = [inst for inst in institutions if crawl_key(inst) not in done]
+    logger.info(f"Crawling {len(to_crawl)} of {len(institutions)} institutions ({state.counts()} so far)")
+    return to_crawl
+
+
+async def scrape_institution(
+    scraper: ProgramScraper,
+    institution: Dict,
+    state: Optional[CrawlState] = None,
+) -> List[Dict]:
+    """Scrape one institution's programs, saving the outcome to the crawl state"""
+    institution_id = institution.get("id")
+    institution_name = institution.get("name")
+    courses_url = institution.get("courses_url")
+    website = institution.get("website")
+    
+    # Try courses_url first, then website
+    url_to_use = courses_url or website
+    
+    if not url_to_use:
+        return []
+    
+    try:
+        logger.info(f"Scraping programs from {institution_name} ({url_to_use})")
+        programs = await parse_pool.fetch_and_parse(
+            scraper, url_to_use, "parse_programs_page", url_to_use, institution_name, institution_id
+        )
+        if programs is None:
+            raise requests.RequestException(f"Could not fetch {url_to_use}")
+        
+        for program in programs:
+            program["institutionId"] = institution_id
+            program["institution_name"] = institution_name
+        
+        logger.info(f"Scraped {len(programs)} programs from {institution_name}")
+        if state:
+            state.mark_done(crawl_key(institution), url_to_use, programs)
+        return programs
+        
+    except Exception as e:
+        logger.error(f"Error scraping programs from {institution_name}: {e}")
+        if state:
+            state.mark_failed(crawl_key(institution), url_to_use, str(e))
+        return []
+
+
+def crawl_priority(institution: Dict) -> Tuple[int, str]:
+    """Order institutions by need: no programs yet first, then least recently verified"""
+    programs = institution.get("programs") or []
+    if not programs:
+        return (0, "")
+    # Timestamps are ISO 8601, which sort in time order; never verified sorts first
+    return (1, min(program.get("lastVerifiedAt") or "" for program in programs))
+
+
+def schedule_institutions(scraper: ProgramScraper, institutions: List[Dict]) -> HostScheduler:
+    """Queue institutions by the host of their course page, within the scraper's per-host limit"""
+    scheduler = HostScheduler(
+        max_in_flight=scraper.async_fetcher.max_concurrency,
+        host_budget=scraper.async_fetcher.per_host_concurrency,
+    )
+    for institution in institutions:
+        url = institution.get("courses_url") or institution.get("website")
+        if url:
+            scheduler.add(url, institution, crawl_priority(institution))
+    return scheduler
+
+
+def _get_institutions(api_url: str, limit_institutions: Optional[int]) -> List[Dict]:
     institutions = get_institutions_from_api(api_url)
     
     # Limit institutions if specified (useful for testing or prioritizing top institutions)
     if limit_institutions:
         institutions = institutions[:limit_institutions]
         logger.info(f"Limited to {limit_institutions} institutions")
+    return institutions
+
+
+def _log_state(state: CrawlState):
+    counts = state.counts()
+    logger.info(f"Crawl state: {counts.get(DONE, 0)} done, {counts.get(FAILED, 0)} failed")
+
+
+async def ascrape_all_programs(
+    api_url: str = "http://localhost:3000",
+    limit_institutions: Optional[int] = None,
+    state: Optional[CrawlState] = None,
+    retry_failed: bool = False,
+) -> List[Dict]:
+    """Scrape programs from all institutions, with many hosts in flight at once
+
+    Institutions are crawled round-robin across the hosts of their course
+    pages, those without programs or verified longest ago first.
+
+    With a crawl state, institutions already done are skipped (or, with
+    retry_failed, only failed ones are crawled), each institution's result is
+    saved as soon as it finishes, and the programs of every done institution
+    are returned.
+    """
+    scraper = ProgramScraper()
+    institutions = _get_institutions(api_url, limit_institutions)
+    to_crawl = select_institutions(institutions, state, retry_failed)
     
-    all_programs = []
-    
-    for institution in institutions:
-        institution_id = institution.get("id")
-        institution_name = institution.get("name")
-        courses_url = institution.get("courses_url")
-        website = institution.get("website")
-        
-        # Try courses_url first, then website
-        url_to_use = courses_url or website
-        
-        if not url_to_use:
-            continue
-        
-        try:
-            logger.info(f"Scraping programs from {institution_name} ({url_to_use})")
-            programs = scraper.scrape_programs_from_url(url_to_use, institution_name, institution_id)
-            
-            for program in programs:
-                program["institutionId"] = institution_id
-                program["institution_name"] = institution_name
-            
-            all_programs.extend(programs)
-            logger.info(f"Scraped {len(programs)} programs from {institution_name}")
-            
-        except Exception as e:
-            logger.error(f"Error scraping programs from {institution_name}: {e}")
-            continue
+    scheduler = schedule_institutions(scraper, to_crawl)
+    results = {}
+    try:
+        async for institution, programs in scheduler.run(lambda inst: scrape_institution(scraper, inst, state)):
+            results[id(institution)] = programs
+    finally:
+        scraper.async_fetcher.close()
+    if state and not retry_failed:
+        state.mark_complete()
     
+    if state:
+        # Include institutions finished by earlier runs
+        all_programs = state.records(crawl_key(inst) for inst in institutions)
+        _log_state(state)
+    else:
+        all_programs = [program for inst in to_crawl for program in results.get(id(inst), [])]
     logger.info(f"Total programs scraped: {len(all_programs)}")
     return all_programs
 
 
-def import_programs_to_db(programs: List[Dict], api_url: str = "http://localhost:3000"):
-    """Import programs to database via API"""
-    endpoint = f"{api_url}/api/scrape/programs"
-    
-    # Send in batches
-    batch_size = 50
-    total_created = 0
-    total_updated = 0
-    total_errors = []
+def iter_programs(
+    api_url: str = "http://localhost:3000",
+    limit_institutions: Optional[int] = None,
+    state: Optional[CrawlState] = None,
+    retry_failed: bool = False,
+) -> Iterator[Dict]:
+    """Yield programs as each institution finishes, for streaming imports
+
+    Crawls the same institutions as ascrape_all_programs. With a crawl state,
+    the saved programs of institutions finished by earlier runs come first.
+    """
+    scraper = ProgramScraper()
+    institutions = _get_institutions(api_url, limit_institutions)
+    to_crawl = select_institutions(institutions, state, retry_failed)
     
-    for i in range(0, len(programs), batch_size):
-        batch = programs[i:i + batch_size]
-        payload = {
-            "programs": batch,
-            "source": "myschoolgist",
-        }
-        
-        try:
-            logger.info(f"Sending batch {i//batch_size + 1} ({len(batch)} programs)...")
-            response = requests.post(
-                endpoint,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=300,
-            )
-            
-            if response.status_code != 200:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', 'Unknown error')
-                    error_details = error_data.get('details', [])
-                    logger.error(f"Batch {i//batch_size + 1} failed: {error_msg}")
-                    if error_details:
-                        # Log first few errors as examples
-                        for detail in error_details[:3]:
-                            logger.error(f"  - {detail.get('path', [])}: {detail.get('message', '')}")
-                except:
-                    error_data = response.text
-                    logger.error(f"Batch {i//batch_size + 1} failed: {error_data[:500]}")
-                total_errors.extend([f"Batch {i//batch_size + 1}: {str(error_data)}"])
-                continue
-            
-            result = response.json()
-            total_created += result.get('results', {}).get('created', 0)
-            total_updated += result.get('results', {}).get('updated', 0)
-            if result.get('results', {}).get('errors'):
-                total_errors.extend(result['results']['errors'])
-        
-        except Exception as e:
-            logger.error(f"Error sending batch {i//batch_size + 1}: {e}")
-            total_errors.extend([f"Batch {i//batch_size + 1}: {str(e)}"])
+    if state:
+        crawling = {crawl_key(inst) for inst in to_crawl}
+        yield from state.records(crawl_key(inst) for inst in institutions if crawl_key(inst) not in crawling)
     
-    logger.info(f"Import completed: Created {total_created}, Updated {total_updated}")
-    if total_errors:
-        logger.warning(f"Total errors: {len(total_errors)}")
+    total = 0
+    try:
+        scheduler = schedule_institutions(scraper, to_crawl)
+        for _, programs in iter_async(scheduler.run(lambda inst: scrape_institution(scraper, inst, state))):
+            total += len(programs)
+            yield from programs
+    finally:
+        scraper.async_fetcher.close()
     
-    return {
-        'success': True,
-        'results': {
-            'created': total_created,
-            'updated': total_updated,
-            'errors': total_errors
-        }
-    }
+    if state:
+        if not retry_failed:
+            # Reached only when every institution was crawled, not when the consumer stops early
+            state.mark_complete()
+        _log_state(state)
+    logger.info(f"Programs scraped this run: {total}")
+
+
+def import_programs_to_db(
+    programs: Iterable[Dict],
+    api_url: str = "http://localhost:3000",
+    output_file: Optional[str] = None,
+):
+    """Import programs to database via API, in batches of 50 as they arrive"""
+    return import_records(
+        programs,
+        f"{api_url}/api/scrape/programs",
+        key="programs",
+        source="myschoolgist",
+        noun="programs",
+        batch_size=50,
+        output_file=output_file,
+        error_details=3,
+    )
 
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Scrape programs from institutions and import them")
+    parser.add_argument("api_url", nargs="?", default="http://localhost:3000")
+    parser.add_argument("--retry-failed", action="store_true", help="only crawl institutions that failed before")
+    parser.add_argument("--fresh", action="store_true", help="discard saved progress and crawl everything")
+    args = parser.parse_args()
+
     logger.info("Starting program scraping process...")
     
-    api_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:3000"
-    
-    # Scrape programs
-    programs = scrape_all_programs(api_url)
-    
-    if not programs:
-        logger.error("No programs scraped!")
-        sys.exit(1)
+    api_url = args.api_url
+    state = CrawlState("programs")
+    if args.fresh:
+        state.reset()
     
-    # Save to JSON file as backup
+    # Scrape programs, saving them to a JSON file as backup and importing them as
+    # each institution finishes
     output_file = "scraped_programs.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(programs, f, indent=2, ensure_ascii=False)
-    logger.info(f"Saved scraped data to {output_file}")
-    
-    # Import to database
     try:
         logger.info(f"Importing to database via {api_url}...")
-        result = import_programs_to_db(programs, api_url)
-        logger.info("Import completed successfully!")
-        logger.info(f"Created: {result['results']['created']}, Updated: {result['results']['updated']}")
+        programs = iter_programs(api_url, state=state, retry_failed=args.retry_failed)
+        result = import_programs_to_db(programs, api_url, output_file)
     except Exception as e:
         logger.error(f"Import failed: {e}")
         logger.info(f"Data saved to {output_file} for manual import")
         sys.exit(1)
-
+    
+    if not result["count"]:
+        logger.error("No programs scraped!")
+        sys.exit(1)
+    
+    logger.info(f"Total programs scraped: {result['count']}")
+    logger.info(f"Saved scraped data to {output_file}")
+    logger.info("Import completed successfully!")
+    logger.info(f"Created: {result['results']['created']}, Updated: {result['results']['updated']}")
 
 if __name__ == "__main__":
     main()
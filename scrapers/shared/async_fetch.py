@@ -0,0 +1,123 @@
+"""
+Async fetch engine shared by the scrapers
+
+Runs the blocking fetch path in a worker pool so many requests can be in
+flight at once, while a per-host semaphore keeps politeness caps in place.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Coroutine, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFetcher:
+    """Run a synchronous fetch function concurrently with per-host limits"""
+
+    def __init__(
+        self,
+        fetch_fn: Callable,
+        max_concurrency: int = 8,
+        per_host_concurrency: int = 1,
+    ):
+        self.fetch_fn = fetch_fn
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the worker pool lazily so constructing a scraper stays cheap"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="scraper-fetch",
+            )
+        return self._executor
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        """Get the semaphore capping requests in flight to a URL's host, for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop they were first used on
+            self._host_semaphores = {}
+            self._loop = loop
+
+        host = urlparse(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def fetch(self, url: str, **kwargs):
+        """Fetch a URL without blocking the event loop, once its host is free"""
+        async with self.host_slot(url):
+            return await self.fetch_in_slot(url, **kwargs)
+
+    async def fetch_in_slot(self, url: str, **kwargs):
+        """Fetch a URL without blocking the event loop, for a caller already holding its host_slot"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            functools.partial(self.fetch_fn, url, **kwargs),
+        )
+
+    async def fetch_all(self, urls: Iterable[str], **kwargs) -> List:
+        """Fetch many URLs concurrently, returning responses in input order"""
+        return await asyncio.gather(*(self.fetch(url, **kwargs) for url in urls))
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def iter_completed(coros: Iterable[Coroutine]) -> Iterator:
+    """Run coroutines on a private event loop, yielding each result as it finishes
+
+    The loop only runs while the caller waits for the next result, so a slow
+    consumer holds back new work instead of letting results pile up.
+    """
+    loop = asyncio.new_event_loop()
+    pending = set()
+    try:
+        pending = {loop.create_task(coro) for coro in coros}
+        while pending:
+            done, pending = loop.run_until_complete(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        # Stopped early: cancel what is left before closing the loop
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+
+def iter_async(items: AsyncIterator) -> Iterator:
+    """Iterate over an async iterator from synchronous code, on a private event loop
+
+    As with iter_completed, the loop only runs while the caller waits for the
+    next item.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(items.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            loop.run_until_complete(aclose())
+        loop.close()
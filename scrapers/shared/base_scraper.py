@@ -2,12 +2,16 @@
 Base scraper class for all scrapers
 """
 import logging
-import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 import requests
-from urllib.robotparser import RobotFileParser
+from urllib.parse import urlparse
+from scrapers.shared.async_fetch import AsyncFetcher
+from scrapers.shared.http_client import http_client
+from scrapers.shared.metrics import FetchMetrics
+from scrapers.shared.rate_limiter import rate_limiter
+from scrapers.shared.robots import robots_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,57 +24,69 @@ class BaseScraper(ABC):
         base_url: str,
         rate_limit_delay: float = 1.0,
         respect_robots: bool = True,
+        max_concurrency: int = 8,
+        per_host_concurrency: int = 1,
     ):
         self.base_url = base_url
+        self.host = urlparse(base_url).netloc.lower()
         self.rate_limit_delay = rate_limit_delay
         self.respect_robots = respect_robots
-        self.robots_parser = None
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "EduRepo-NG-AI/1.0 (Educational Research)",
-        })
-
-        if self.respect_robots:
-            self._load_robots_txt()
-
-    def _load_robots_txt(self):
-        """Load and parse robots.txt"""
-        try:
-            robots_url = f"{self.base_url}/robots.txt"
-            self.robots_parser = RobotFileParser()
-            self.robots_parser.set_url(robots_url)
-            self.robots_parser.read()
-            logger.info(f"Loaded robots.txt from {robots_url}")
-        except Exception as e:
-            logger.warning(f"Could not load robots.txt: {e}")
-            self.robots_parser = None
+        self.http = http_client
+        self.metrics = FetchMetrics(type(self).__name__)
+        self.async_fetcher = AsyncFetcher(
+            self.fetch,
+            max_concurrency=max_concurrency,
+            per_host_concurrency=per_host_concurrency,
+        )
+        rate_limiter.configure(self.host, rate_limit_delay)
 
     def can_fetch(self, url: str) -> bool:
         """Check if URL can be fetched according to robots.txt"""
-        if not self.respect_robots or not self.robots_parser:
+        if not self.respect_robots:
             return True
-        return self.robots_parser.can_fetch(self.session.headers["User-Agent"], url)
+        return robots_cache.can_fetch(url, self.http.user_agent)
 
     def fetch(self, url: str, **kwargs) -> Optional[requests.Response]:
-        """Fetch a URL with rate limiting and robots.txt checking"""
+        """Fetch a URL through the shared HTTP client, checking robots.txt first"""
+        if not self.can_fetch(url):
+            logger.warning(f"Blocked by robots.txt: {url}")
+            return None
+
+        return self.http.fetch(url, min_interval=self.rate_limit_delay, metrics=self.metrics, **kwargs)
+
+    def download(self, url: str, **kwargs) -> Optional[BinaryIO]:
+        """Stream a URL into a temp file, checking robots.txt first"""
         if not self.can_fetch(url):
             logger.warning(f"Blocked by robots.txt: {url}")
             return None
 
         try:
-            time.sleep(self.rate_limit_delay)
-            response = self.session.get(url, timeout=30, **kwargs)
-            response.raise_for_status()
-            return response
+            return self.http.download(url, min_interval=self.rate_limit_delay, metrics=self.metrics, **kwargs)
         except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {e}")
+            logger.error(f"Error downloading {url}: {e}")
             return None
 
+    async def afetch(self, url: str, **kwargs) -> Optional[requests.Response]:
+        """Fetch a URL asynchronously, capped per host"""
+        return await self.async_fetcher.fetch(url, **kwargs)
+
+    async def afetch_all(self, urls: Iterable[str], **kwargs) -> List[Optional[requests.Response]]:
+        """Fetch many URLs concurrently, returning responses in input order"""
+        return await self.async_fetcher.fetch_all(urls, **kwargs)
+
     @abstractmethod
     def scrape_institutions(self) -> List[Dict]:
         """Scrape institutions - must be implemented by subclasses"""
         pass
 
+    def iter_institutions(self) -> Iterator[Dict]:
+        """Yield institutions as they are scraped, for streaming imports
+
+        Scrapers that fetch many pages override this to yield each page's
+        institutions as soon as it is parsed.
+        """
+        yield from self.scrape_institutions()
+
     @abstractmethod
     def scrape_programs(self, institution_id: Optional[str] = None) -> List[Dict]:
         """Scrape programs - must be implemented by subclasses"""
@@ -0,0 +1,167 @@
+"""
+Per-host circuit breaker and negative cache for the scrapers
+
+Hosts that fail to resolve, refuse connections or time out are remembered,
+so later requests to them fail immediately instead of burning the timeout
+budget again. DNS failures open the circuit straight away; failed connections
+and read timeouts open it after a few consecutive attempts. Only circuits
+opened by DNS or connection failures are persisted, so dead domains stay
+skipped across runs until their TTL expires while a host that was merely slow
+is tried again next run.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from scrapers.shared.env import env_flag
+from scrapers.shared.files import atomic_write
+from scrapers.shared.http_cache import DEFAULT_CACHE_DIR
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:  # urllib3 < 2
+    NameResolutionError = None
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv("SCRAPER_BREAKER_THRESHOLD", "2"))
+COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", str(15 * 60)))
+DEAD_HOST_TTL = float(os.getenv("SCRAPER_DEAD_HOST_TTL", str(6 * 60 * 60)))
+BREAKER_PERSIST = env_flag("SCRAPER_BREAKER_PERSIST")
+
+DNS_FAILURE = "dns"
+TIMEOUT = "timeout"
+CONNECTION_FAILURE = "connection"
+# Failures that say the host is gone rather than slow
+PERSISTED_FAILURES = (DNS_FAILURE, CONNECTION_FAILURE)
+
+DNS_ERROR_MARKERS = ("name or service not known", "nodename nor servname", "getaddrinfo failed", "no address associated")
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Raised instead of contacting a host whose circuit is open"""
+
+
+@dataclass
+class HostState:
+    """Failure history for one host"""
+    failures: int = 0
+    open_until: float = 0.0
+    reason: str = ""
+
+
+def classify_failure(error: Exception) -> Optional[str]:
+    """Classify a request error as a host-level failure, or None if the host answered"""
+    if isinstance(error, HostUnavailable):
+        return None
+    if isinstance(error, requests.ConnectTimeout):
+        return CONNECTION_FAILURE
+    if isinstance(error, requests.Timeout):
+        return TIMEOUT
+    if not isinstance(error, requests.ConnectionError):
+        return None
+
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)
+    if NameResolutionError is not None and isinstance(reason, NameResolutionError):
+        return DNS_FAILURE
+    if any(marker in str(reason).lower() for marker in DNS_ERROR_MARKERS):
+        return DNS_FAILURE
+    return CONNECTION_FAILURE
+
+
+class CircuitBreaker:
+    """Circuit breaker keyed by host"""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN,
+        dead_host_ttl: float = DEAD_HOST_TTL,
+        path: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, "dead_hosts.json") if BREAKER_PERSIST else None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.dead_host_ttl = dead_host_ttl
+        self.path = path
+        self._hosts: Optional[Dict[str, HostState]] = None
+        self._lock = threading.Lock()
+
+    def _states(self) -> Dict[str, HostState]:
+        """Load persisted open circuits on first use"""
+        if self._hosts is None:
+            self._hosts = {}
+            if self.path:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        stored = json.load(f)
+                except (OSError, ValueError):
+                    stored = {}
+                now = time.time()
+                for host, data in stored.items():
+                    if data["open_until"] > now:
+                        self._hosts[host] = HostState(self.failure_threshold, data["open_until"], data["reason"])
+        return self._hosts
+
+    def check(self, url: str):
+        """Raise HostUnavailable if the URL's host is known to be down"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._states().get(host)
+            if state and state.open_until > time.time():
+                raise HostUnavailable(f"Skipping {url}: {host} is unavailable ({state.reason})")
+
+    def record_success(self, url: str):
+        """Close the circuit for a host that answered"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._states().pop(host, None)
+            if state and state.open_until:
+                self._save()
+
+    def record_failure(self, url: str, error: Exception):
+        """Count a failed request against its host"""
+        reason = classify_failure(error)
+        if reason is None:
+            return
+
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            state = self._states().setdefault(host, HostState())
+            state.failures += 1
+            state.reason = reason
+
+            if reason == DNS_FAILURE:
+                state.open_until = time.time() + self.dead_host_ttl
+            elif state.failures >= self.failure_threshold:
+                state.open_until = time.time() + self.cooldown
+            else:
+                return
+
+            logger.info(f"Circuit open for {host} ({reason}) until {time.ctime(state.open_until)}")
+            if reason in PERSISTED_FAILURES:
+                self._save()
+
+    def _save(self):
+        """Persist circuits opened by DNS or connection failures"""
+        if not self.path:
+            return
+        open_hosts = {
+            host: {"open_until": state.open_until, "reason": state.reason}
+            for host, state in self._hosts.items()
+            if state.open_until > time.time() and state.reason in PERSISTED_FAILURES
+        }
+        try:
+            atomic_write(self.path, json.dumps(open_hosts))
+        except OSError as e:
+            logger.warning(f"Could not persist dead hosts: {e}")
+
+
+circuit_breaker = CircuitBreaker()
@@ -0,0 +1,139 @@
+"""
+Checkpointed crawl state for long scraping jobs
+
+Each item a job crawls (usually one URL) is recorded in SQLite as soon as it
+finishes, with its status, timestamps, error and extracted records. An
+interrupted job resumes by skipping the items already done, and a later run
+can retry only the items that failed. Once a run gets through every item the
+job is marked complete, and the next run starts over instead of resuming.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from scrapers.shared.http_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_items (
+    job TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    records TEXT,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job, key)
+);
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    job TEXT PRIMARY KEY,
+    completed_at REAL NOT NULL
+);
+"""
+
+
+class CrawlState:
+    """Per-item progress of one crawl job, persisted in SQLite"""
+
+    def __init__(self, job: str, path: str = os.path.join(DEFAULT_CACHE_DIR, "crawl_state.sqlite3")):
+        self.job = job
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def keys(self, status: str) -> Set[str]:
+        """Get the keys of items with a status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM crawl_items WHERE job = ? AND status = ?", (self.job, status)
+            ).fetchall()
+        return {key for (key,) in rows}
+
+    def mark_done(self, key: str, url: Optional[str], records: List[Dict]):
+        """Record an item as done with the records extracted from it"""
+        self._save(key, url, DONE, None, json.dumps(records, ensure_ascii=False))
+
+    def mark_failed(self, key: str, url: Optional[str], error: str):
+        """Record an item as failed"""
+        self._save(key, url, FAILED, error, None)
+
+    def _save(self, key: str, url: Optional[str], status: str, error: Optional[str], records: Optional[str]):
+        now = time.time()
+        with self._lock:
+            # Each item is committed on its own, so an interrupted job loses at most the items in flight
+            self._conn.execute(
+                """
+                INSERT INTO crawl_items (job, key, url, status, attempts, error, records, first_seen, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (job, key) DO UPDATE SET
+                    url = excluded.url,
+                    status = excluded.status,
+                    attempts = attempts + 1,
+                    error = excluded.error,
+                    records = COALESCE(excluded.records, records),
+                    updated_at = excluded.updated_at
+                """,
+                (self.job, key, url, status, error, records, now, now),
+            )
+            self._conn.commit()
+
+    def records(self, keys: Iterable[str]) -> List[Dict]:
+        """Get the records of the done items among keys, in the order of keys"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, records FROM crawl_items WHERE job = ? AND status = ?", (self.job, DONE)
+            ).fetchall()
+        stored = dict(rows)
+        records = []
+        for key in keys:
+            if key in stored:
+                records.extend(json.loads(stored[key] or "[]"))
+        return records
+
+    def counts(self) -> Dict[str, int]:
+        """Count the job's items by status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM crawl_items WHERE job = ? GROUP BY status", (self.job,)
+            ).fetchall()
+        return dict(rows)
+
+    def mark_complete(self):
+        """Record that a run got through every item of the job"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_jobs (job, completed_at) VALUES (?, ?)", (self.job, time.time())
+            )
+            self._conn.commit()
+
+    def completed_at(self) -> Optional[float]:
+        """Get when the job was last completed, or None if it is new or was interrupted"""
+        with self._lock:
+            row = self._conn.execute("SELECT completed_at FROM crawl_jobs WHERE job = ?", (self.job,)).fetchone()
+        return row[0] if row else None
+
+    def reset(self):
+        """Forget the job's progress"""
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_items WHERE job = ?", (self.job,))
+            self._conn.execute("DELETE FROM crawl_jobs WHERE job = ?", (self.job,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,90 @@
+"""
+Disk budget with least-recently-used eviction for the on-disk caches
+
+A cache entry is a set of files sharing a name in the cache directory, e.g.
+`<key>.json` and `<key>.body`. One of them counts toward the budget and the
+modification time of one marks when the entry was last used, so readers touch
+that file on every hit. Once the cache outgrows its budget, the least recently
+used entries are removed until it is back under 90% of it.
+"""
+import logging
+import os
+import threading
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def touch(path: str):
+    """Mark a cache entry as used just now"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class DiskBudget:
+    """Size accounting and LRU eviction for one cache directory"""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        name: str,
+        size_suffix: str,
+        used_suffix: Optional[str] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        self.size_suffix = size_suffix
+        self.used_suffix = used_suffix or size_suffix
+        # Files removed with an entry
+        self.suffixes = tuple(dict.fromkeys((size_suffix, self.used_suffix)))
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def account(self, delta: int):
+        """Record that the counted files grew by delta bytes, evicting when over budget"""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += delta
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> Iterator[Tuple[str, int, float]]:
+        """Yield (entry path without suffix, size, last_used) for every entry"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(self.size_suffix):
+                    continue
+                stem = os.path.join(root, name[:-len(self.size_suffix)])
+                try:
+                    size = os.path.getsize(stem + self.size_suffix)
+                    used_path = stem + self.used_suffix
+                    last_used = os.path.getmtime(used_path) if os.path.exists(used_path) else 0
+                except OSError:
+                    continue
+                yield stem, size, last_used
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        self._size = sum(size for _, size, _ in entries)
+        evicted = 0
+
+        for stem, size, _ in entries:
+            if self._size <= target:
+                break
+            for suffix in self.suffixes:
+                try:
+                    os.remove(stem + suffix)
+                except OSError:
+                    pass
+            self._size -= size
+            evicted += 1
+
+        logger.info(f"Evicted {evicted} entries from {self.name} ({self._size} bytes remain)")
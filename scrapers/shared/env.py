@@ -0,0 +1,14 @@
+"""
+Environment configuration helpers for the scrapers
+"""
+import os
+
+FALSE_VALUES = ("0", "false", "no", "off")
+
+
+def env_flag(name: str, default: bool = True) -> bool:
+    """Read an on/off setting: any value but 0, false, no or off turns it on"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() not in FALSE_VALUES
@@ -0,0 +1,28 @@
+"""
+File helpers for the on-disk caches and state
+"""
+import os
+import threading
+from typing import Union
+
+
+def atomic_write(path: str, data: Union[bytes, str]):
+    """Write a file so readers see either the old contents or the new, never a partial write
+
+    The data goes to a temporary file next to the target, which then replaces
+    it. Parent directories are created as needed; OSError is left to the caller.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,191 @@
+"""
+Nigerian gazetteer for locating institutions by name
+
+States mirror lib/constants/nigerian-states.ts. Every state, alias and major
+city is indexed once, so one scan over the words of a name finds both its
+state and its city. Whole-word matching means "Niger" no
+longer matches inside "Nigeria", and longer names win over the names inside
+them ("Niger Delta" is not Niger, "Ado-Ekiti" is a city, not just Ekiti).
+Words joined by a hyphen are one name, so a place never matches part of a
+compound: "Benin-Owena" is not Benin.
+"""
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# The 36 states plus the Federal Capital Territory
+NIGERIAN_STATES = [
+    "Abia", "Adamawa", "Akwa Ibom", "Anambra", "Bauchi", "Bayelsa",
+    "Benue", "Borno", "Cross River", "Delta", "Ebonyi", "Edo",
+    "Ekiti", "Enugu", "FCT", "Gombe", "Imo", "Jigawa", "Kaduna",
+    "Kano", "Katsina", "Kebbi", "Kogi", "Kwara", "Lagos", "Nasarawa",
+    "Niger", "Ogun", "Ondo", "Osun", "Oyo", "Plateau", "Rivers",
+    "Sokoto", "Taraba", "Yobe", "Zamfara",
+]
+
+# Other names and spellings of a state
+STATE_ALIASES = {
+    "Federal Capital Territory": "FCT",
+    "Nassarawa": "Nasarawa",
+}
+
+# Major cities, towns and LGAs, with their state
+CITIES = {
+    "Abia": ["Aba", "Umuahia", "Ohafia", "Uturu", "Arochukwu", "Umudike"],
+    "Adamawa": ["Yola", "Mubi", "Ganye", "Numan"],
+    "Akwa Ibom": ["Uyo", "Ikot Ekpene", "Ikot Osurua", "Eket", "Oron", "Ikono", "Abak"],
+    "Anambra": ["Awka", "Onitsha", "Nnewi", "Igbariam", "Uli", "Oko", "Ihiala", "Nsugbe", "Umunya", "Ifite-Ogwari"],
+    "Bauchi": ["Azare", "Misau", "Jama'are", "Kangere"],
+    "Bayelsa": ["Yenagoa", "Amassoma", "Otuoke", "Sagbama", "Ogbia"],
+    "Benue": ["Makurdi", "Gboko", "Otukpo", "Katsina-Ala", "Oju", "Ugbokolo"],
+    "Borno": ["Maiduguri", "Biu", "Bama", "Konduga"],
+    "Cross River": ["Calabar", "Ugep", "Ogoja", "Obudu", "Ikom", "Akamkpa"],
+    "Delta": [
+        "Asaba", "Warri", "Abraka", "Agbor", "Ozoro", "Oghara", "Ogwashi-Uku",
+        "Sapele", "Ughelli", "Kwale", "Mosogar", "Effurun", "Oleh", "Agbarho", "Orogun",
+    ],
+    "Ebonyi": ["Abakaliki", "Afikpo", "Ikwo", "Onueke", "Uburu"],
+    "Edo": ["Benin City", "Benin", "Ekpoma", "Auchi", "Uromi", "Ekiadolor", "Igueben", "Usen", "Iyamho", "Okada"],
+    "Ekiti": [
+        "Ado-Ekiti", "Ikere-Ekiti", "Oye-Ekiti", "Ikole-Ekiti", "Iyin-Ekiti", "Ijero-Ekiti", "Ilawe-Ekiti",
+        "Efon-Alaaye",
+    ],
+    "Enugu": ["Nsukka", "Agbani", "Eha-Amufu", "Oji River", "Awgu", "Udi"],
+    "FCT": ["Abuja", "Gwagwalada", "Kuje", "Bwari", "Garki", "Zuba"],
+    "Gombe": ["Kumo", "Billiri", "Kaltungo"],
+    "Imo": ["Owerri", "Okigwe", "Orlu", "Oguta", "Umuagwo", "Nekede", "Ihiagwa"],
+    "Jigawa": ["Dutse", "Hadejia", "Kazaure", "Gumel", "Ringim", "Birnin Kudu"],
+    "Kaduna": ["Zaria", "Kafanchan", "Samaru", "Gidan Waya", "Kagoro"],
+    "Kano": ["Wudil", "Kumbotso", "Rano", "Bichi"],
+    "Katsina": ["Funtua", "Daura", "Dutsin-Ma", "Malumfashi", "Kankia"],
+    "Kebbi": ["Birnin Kebbi", "Argungu", "Zuru", "Yauri", "Jega", "Aliero"],
+    "Kogi": ["Lokoja", "Anyigba", "Idah", "Okene", "Ankpa", "Kabba", "Osara", "Dekina"],
+    "Kwara": ["Ilorin", "Offa", "Omu-Aran", "Malete", "Lafiagi", "Pategi"],
+    "Lagos": [
+        "Ikeja", "Ikorodu", "Epe", "Badagry", "Yaba", "Akoka", "Surulere",
+        "Ojo", "Isolo", "Ijanikin", "Lekki", "Victoria Island", "Idi-Araba",
+    ],
+    "Nasarawa": ["Lafia", "Keffi", "Akwanga", "Doma", "Nasarawa Eggon"],
+    "Niger": ["Minna", "Bida", "Kontagora", "Suleja", "Mokwa", "Lapai", "New Bussa"],
+    "Ogun": [
+        "Abeokuta", "Ijebu-Ode", "Ilaro", "Sagamu", "Ago-Iwoye", "Ota",
+        "Ilishan-Remo", "Ilisan-Remo", "Ijebu-Igbo", "Igbesa", "Iperu", "Mowe",
+        "Ijebu-Itele", "Ado-Odo",
+    ],
+    "Ondo": ["Akure", "Owo", "Okitipupa", "Ikare", "Ikare-Akoko", "Akungba-Akoko", "Ilara-Mokin", "Oka-Akoko"],
+    "Osun": [
+        "Osogbo", "Oshogbo", "Ile-Ife", "Ife", "Ilesa", "Ilesha", "Iwo", "Ede",
+        "Ikirun", "Esa-Oke", "Ila-Orangun", "Ipetumodu", "Ikire", "Iree", "Okuku",
+        "Ikeji-Arakeji", "Ipetu-Ijesa",
+    ],
+    "Oyo": ["Ibadan", "Ogbomoso", "Saki", "Iseyin", "Eruwa", "Igboho", "Igbo-Ora", "Oyo-Ile"],
+    "Plateau": ["Jos", "Bukuru", "Pankshin", "Shendam", "Barkin Ladi"],
+    "Rivers": ["Port Harcourt", "Rumuolumeni", "Omoku", "Bori", "Ahoada", "Choba", "Nkpolu", "Oyigbo"],
+    "Sokoto": ["Wamakko", "Tambuwal", "Gwadabawa"],
+    "Taraba": ["Jalingo", "Wukari", "Takum"],
+    "Yobe": ["Damaturu", "Potiskum", "Geidam", "Gashua", "Nguru"],
+    "Zamfara": ["Gusau", "Talata Mafara", "Kaura Namoda", "Tsafe"],
+}
+
+# Phrases that contain a state name but are not a location
+NON_PLACES = ["Niger Delta", "on the Niger"]
+
+
+class Location(NamedTuple):
+    """State and city found in a name, None where not found"""
+
+    state: Optional[str]
+    city: Optional[str]
+
+
+WORD_RE = re.compile(r"\w+(?:'\w+)*")
+# A word and, if another word follows it, the spaces or hyphens joining them
+# (a bare "-" joins the words of a compound)
+TOKEN_RE = re.compile(r"(\w+(?:'\w+)*)((?:[\s\-]+(?=\w))?)")
+
+
+def _key(name: str) -> str:
+    """Normalise a place name for lookup: lower case, one space between words"""
+    return " ".join(WORD_RE.findall(name.lower()))
+
+
+def _build() -> Tuple[Dict[str, Tuple[Optional[str], Optional[str]]], Dict[str, int]]:
+    """Index every place name, and the most words in a name starting with each word"""
+    places: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for state, cities in CITIES.items():
+        for city in cities:
+            places[_key(city)] = (state, city)
+    for alias, state in STATE_ALIASES.items():
+        places[_key(alias)] = (state, None)
+    for state in NIGERIAN_STATES:
+        places[_key(state)] = (state, None)
+    for phrase in NON_PLACES:
+        places[_key(phrase)] = (None, None)
+
+    first_words: Dict[str, int] = {}
+    for name in places:
+        words = name.split()
+        first_words[words[0]] = max(first_words.get(words[0], 0), len(words))
+    return places, first_words
+
+
+PLACES, FIRST_WORDS = _build()
+
+
+def locate(text: str) -> Location:
+    """Find the state and city named in text, in one scan
+
+    Each word is looked up once; only words that start a place name try the
+    longer names first. A name must cover hyphenated compounds whole. The
+    first state named outright wins; otherwise the state comes from the first
+    known city.
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    state = None
+    city_state = None
+    city = None
+    i = 0
+    while i < len(tokens):
+        longest = FIRST_WORDS.get(tokens[i][0])
+        # A name can't start inside a compound
+        if longest is None or (i > 0 and tokens[i - 1][1] == "-"):
+            i += 1
+            continue
+
+        # Only words joined by spaces or hyphens make up one name
+        run = 1
+        while run < longest and tokens[i + run - 1][1] and i + run < len(tokens):
+            run += 1
+        place = None
+        for n in range(run, 0, -1):
+            # Nor end inside one
+            if tokens[i + n - 1][1] == "-":
+                continue
+            place = PLACES.get(" ".join(word for word, _ in tokens[i:i + n]))
+            if place is not None:
+                break
+        if place is None:
+            i += 1
+            continue
+
+        place_state, place_city = place
+        if place_city is None:
+            if state is None:
+                state = place_state
+        elif city is None:
+            city = place_city
+            city_state = place_state
+        if state is not None and city is not None:
+            break
+        i += n
+    return Location(state or city_state, city)
+
+
+def state_named(text: str) -> Optional[str]:
+    """Get the state if the whole text names one ("Kano", "Kano State", "FCT"), else None"""
+    key = _key(text)
+    if key.endswith(" state"):
+        key = key[: -len(" state")]
+    place = PLACES.get(key)
+    if place is None or place[1] is not None:
+        return None
+    return place[0]
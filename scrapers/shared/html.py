@@ -0,0 +1,192 @@
+"""
+HTML parsing for the scrapers
+
+Every scraper builds its soup through make_soup, so the parser backend is
+chosen in one place with SCRAPER_HTML_PARSER:
+
+- lxml (default) - BeautifulSoup on lxml, falling back to html.parser if lxml is missing
+- html.parser / html5lib - BeautifulSoup on that parser
+- selectolax - BeautifulSoup on lxml, plus a fast path for hot table extraction
+  that reads pages through selectolax's lexbor parser
+
+The fast path hands routines a LexborTag, a thin wrapper exposing the small
+part of the BeautifulSoup API those routines use (find, find_all, get_text,
+get), so the extraction code is the same for every backend.
+
+Pages are decoded once, before parsing, from the encodings they declare;
+charset detection is only the fallback. response_html keeps the decoded text
+on the response so every parse of the same page reuses it.
+"""
+import logging
+import os
+import re
+from typing import List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+from bs4.dammit import EncodingDetector
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+SELECTOLAX = "selectolax"
+HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "lxml").lower()
+
+CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+
+# Attributes BeautifulSoup splits into lists
+MULTI_VALUED_ATTRIBUTES = ("class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone")
+
+
+def soup_features(parser: Optional[str] = None) -> str:
+    """Get the BeautifulSoup parser to use for a backend"""
+    parser = (parser or HTML_PARSER).lower()
+    if parser == SELECTOLAX:
+        parser = "lxml"
+    if parser == "lxml" and not HAS_LXML:
+        return "html.parser"
+    return parser
+
+
+def decode_html(markup: Union[str, bytes], declared: Optional[str] = None) -> str:
+    """Decode a page, trying the encodings it declares before detecting one
+
+    A byte order mark wins, then the charset the server declared, then the
+    page's own <meta charset> or XML declaration, then UTF-8. Each is only
+    used if the whole page decodes with it. Charset detection, which is slow
+    on large non-ASCII pages and can guess wrong, only runs if none fits.
+    """
+    if isinstance(markup, str):
+        return markup
+
+    data, bom_encoding = EncodingDetector.strip_byte_order_mark(markup)
+    meta_encoding = EncodingDetector.find_declared_encoding(data, is_html=True)
+    for encoding in (bom_encoding, declared, meta_encoding, "utf-8"):
+        if not encoding:
+            continue
+        try:
+            return data.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+
+    logger.debug("No declared encoding fits the page, detecting it")
+    return UnicodeDammit(markup, is_html=True).unicode_markup
+
+
+def response_html(response) -> str:
+    """Get a response body as text, decoded once and shared by every parse of it"""
+    text = getattr(response, "_html_text", None)
+    if text is None:
+        match = CHARSET_RE.search(response.headers.get("content-type", ""))
+        text = decode_html(response.content, match.group(1) if match else None)
+        response._html_text = text
+    return text
+
+
+def make_soup(
+    markup: Union[str, bytes],
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
+) -> BeautifulSoup:
+    """Parse HTML with the configured BeautifulSoup backend"""
+    return BeautifulSoup(decode_html(markup), soup_features(parser), parse_only=parse_only)
+
+
+def make_region_soup(
+    markup: Union[str, bytes],
+    parse_only: SoupStrainer,
+    required: Optional[str] = None,
+    parser: Optional[str] = None,
+) -> BeautifulSoup:
+    """Parse only the region a scraper needs, or the whole page if it is missing
+
+    Elements outside `parse_only` are never built, which saves time and memory
+    on pages full of navigation and scripts. If the region has no elements (or
+    none named `required`), the page is parsed in full instead.
+    """
+    markup = decode_html(markup)
+    features = soup_features(parser)
+    if features == "html5lib":
+        # html5lib does not support parse_only
+        return make_soup(markup, parser=parser)
+
+    soup = BeautifulSoup(markup, features, parse_only=parse_only)
+    if soup.find(required) is None:
+        logger.debug("Parse-only region not found, parsing the whole page")
+        return make_soup(markup, parser=parser)
+    return soup
+
+
+class LexborTag:
+    """A selectolax node behind the subset of the BeautifulSoup Tag API the fast paths use"""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self) -> str:
+        return self.node.tag
+
+    @staticmethod
+    def _selector(name: Union[str, Sequence[str]], href: Optional[bool]) -> str:
+        names = (name,) if isinstance(name, str) else name
+        return ", ".join(f"{tag}[href]" if href else tag for tag in names)
+
+    # lexbor matches selectors against the node itself too, so search from its children
+
+    def find_all(self, name: Union[str, Sequence[str]], href: Optional[bool] = None) -> List["LexborTag"]:
+        """Find descendant elements by tag name, optionally only those with an href"""
+        selector = self._selector(name, href)
+        return [
+            LexborTag(node)
+            for child in self.node.iter(include_text=False)
+            for node in child.css(selector)
+        ]
+
+    def find(self, name: Union[str, Sequence[str]], href: Optional[bool] = None) -> Optional["LexborTag"]:
+        """Find the first descendant element by tag name"""
+        selector = self._selector(name, href)
+        for child in self.node.iter(include_text=False):
+            node = child.css_first(selector)
+            if node is not None:
+                return LexborTag(node)
+        return None
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        """Get the element's text, like Tag.get_text"""
+        strings = (node.text_content for node in self.node.traverse(include_text=True) if node.tag == "-text")
+        if strip:
+            return separator.join(text.strip() for text in strings if text and text.strip())
+        return separator.join(text for text in strings if text)
+
+    def get(self, key: str, default=None):
+        """Get an attribute value, like Tag.get"""
+        attributes = self.node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key] or ""
+        if key in MULTI_VALUED_ATTRIBUTES:
+            return value.split()
+        return value
+
+
+def make_fast_tree(markup: Union[str, bytes], parser: Optional[str] = None) -> Optional[LexborTag]:
+    """Parse HTML for a fast path, or None if selectolax is not the configured backend"""
+    if (parser or HTML_PARSER).lower() != SELECTOLAX:
+        return None
+    if LexborHTMLParser is None:
+        logger.warning("SCRAPER_HTML_PARSER=selectolax but selectolax is not installed")
+        return None
+    # Decode the same way as make_soup, so both paths see the same text
+    return LexborTag(LexborHTMLParser(decode_html(markup)).root)
@@ -0,0 +1,226 @@
+"""
+On-disk HTTP cache for the scrapers
+
+Stores response bodies, headers and validators so re-scrapes can revalidate
+with If-None-Match / If-Modified-Since and serve unchanged pages from disk.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from scrapers.shared.disk_budget import DiskBudget, touch
+from scrapers.shared.env import env_flag
+from scrapers.shared.files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", os.path.join("data", "cache"))
+DEFAULT_MAX_AGE = float(os.getenv("SCRAPER_HTTP_CACHE_MAX_AGE", str(6 * 60 * 60)))
+DEFAULT_MAX_BYTES = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_ENABLED = env_flag("SCRAPER_HTTP_CACHE")
+
+# Bodies are stored decoded, so transfer-level headers no longer apply
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Headers a 304 may carry that supersede the stored ones
+REFRESHED_HEADERS = ("etag", "last-modified", "date", "expires", "cache-control")
+
+
+@dataclass
+class CacheEntry:
+    """A cached response"""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    stored_at: float
+    body_path: str
+    meta_path: str
+
+    @property
+    def etag(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return CaseInsensitiveDict(self.headers).get("last-modified")
+
+
+def build_response(url: str, status_code: int, headers: Dict[str, str], body: bytes) -> requests.Response:
+    """Build a requests.Response from stored parts"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else ""
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    return response
+
+
+class HttpCache:
+    """Persistent response cache with conditional revalidation"""
+
+    def __init__(
+        self,
+        directory: str = os.path.join(DEFAULT_CACHE_DIR, "http"),
+        max_age: float = DEFAULT_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = CACHE_ENABLED,
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self.enabled = enabled
+        self.budget = DiskBudget(directory, max_bytes, "HTTP cache", size_suffix=".body", used_suffix=".json")
+
+    def _paths(self, url: str):
+        """Get the metadata and body paths for a URL"""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        subdir = os.path.join(self.directory, key[:2])
+        return os.path.join(subdir, f"{key}.json"), os.path.join(subdir, f"{key}.body")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Look up a cached entry for a URL"""
+        if not self.enabled:
+            return None
+
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(body_path):
+            return None
+
+        return CacheEntry(
+            url=meta["url"],
+            status_code=meta["status_code"],
+            headers=meta["headers"],
+            stored_at=meta["stored_at"],
+            body_path=body_path,
+            meta_path=meta_path,
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Check if an entry can be served without revalidating"""
+        return time.time() - entry.stored_at < self.max_age
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Build revalidation headers for an entry"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def to_response(self, entry: CacheEntry) -> requests.Response:
+        """Turn a cache entry into a response"""
+        with open(entry.body_path, "rb") as f:
+            body = f.read()
+
+        touch(entry.meta_path)
+
+        response = build_response(entry.url, entry.status_code, entry.headers, body)
+        response.from_cache = True
+        return response
+
+    def refresh(self, entry: CacheEntry, not_modified: requests.Response):
+        """Mark an entry as revalidated after a 304"""
+        headers = CaseInsensitiveDict(entry.headers)
+        for name in REFRESHED_HEADERS:
+            if name in not_modified.headers:
+                headers[name] = not_modified.headers[name]
+        entry.headers = dict(headers)
+        entry.stored_at = time.time()
+        self._write_meta(entry.meta_path, entry.url, entry.status_code, entry.headers, entry.stored_at)
+
+    def store(self, url: str, response: requests.Response):
+        """Store a successful response"""
+        if not self.enabled or response.status_code != 200:
+            return
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            return
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+        meta_path, body_path = self._paths(url)
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            atomic_write(body_path, response.content)
+            self._write_meta(meta_path, url, response.status_code, headers, time.time())
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+            return
+
+        self.budget.account(len(response.content) - old_size)
+
+    def _write_meta(self, meta_path: str, url: str, status_code: int, headers: Dict[str, str], stored_at: float):
+        meta = {
+            "url": url,
+            "status_code": status_code,
+            "headers": headers,
+            "stored_at": stored_at,
+        }
+        atomic_write(meta_path, json.dumps(meta))
+
+    def fetch(
+        self,
+        session: requests.Session,
+        url: str,
+        before_request: Optional[Callable[[], object]] = None,
+        after_response: Optional[Callable[[requests.Response], object]] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """GET a URL through the cache
+
+        Fresh entries are served from disk; stale ones are revalidated and a
+        304 is answered from disk. `before_request` runs only when the network
+        is actually used (e.g. to take a rate-limit token). `after_response`
+        gets the streamed network response and must read its body (e.g. to
+        enforce a size limit) before it is cached.
+        """
+        cacheable = self.enabled and not kwargs.get("params") and not kwargs.get("stream")
+        entry = self.get(url) if cacheable else None
+
+        if entry and self.is_fresh(entry):
+            logger.debug(f"HTTP cache hit: {url}")
+            return self.to_response(entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            headers.update(self.conditional_headers(entry))
+
+        if before_request:
+            before_request()
+        if after_response:
+            response = session.get(url, headers=headers, stream=True, **kwargs)
+            if not (entry and response.status_code == 304):
+                after_response(response)
+        else:
+            response = session.get(url, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            self.refresh(entry, response)
+            response.close()
+            revalidated = self.to_response(entry)
+            revalidated.revalidated = True
+            revalidated.elapsed = response.elapsed
+            return revalidated
+
+        if cacheable:
+            self.store(url, response)
+        return response
+
+
+http_cache = HttpCache()
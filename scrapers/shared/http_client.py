@@ -0,0 +1,440 @@
+"""
+Shared HTTP client for the scrapers
+
+One pooled, retrying session for every scraper in the process: keep-alive
+connections are reused per host, transient failures back off exponentially
+(honoring Retry-After), and timeouts are configured here and nowhere else.
+"""
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from scrapers.shared.circuit_breaker import COOLDOWN, circuit_breaker
+from scrapers.shared.http_cache import http_cache
+from scrapers.shared.metrics import FetchMetrics, RequestMetrics, current_request, track_request
+from scrapers.shared.rate_limiter import rate_limiter
+from scrapers.shared.replay import fetch_archive
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "EduRepo-NG-AI/1.0 (Educational Research)")
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (
+    float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "10")),
+    float(os.getenv("SCRAPER_READ_TIMEOUT", "30")),
+)
+# Domain existence probes should fail fast
+PROBE_TIMEOUT = (
+    float(os.getenv("SCRAPER_PROBE_TIMEOUT", "5")),
+    float(os.getenv("SCRAPER_PROBE_TIMEOUT", "5")),
+)
+
+MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("SCRAPER_BACKOFF_FACTOR", "1.0"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Downloads stay in memory up to this size, then spill to a temp file
+SPOOL_MAX_MEMORY = int(os.getenv("SCRAPER_SPOOL_MAX_MEMORY", str(1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+# How long a failed probe URL is skipped before it is probed again
+PROBE_MISS_TTL = float(os.getenv("SCRAPER_PROBE_MISS_TTL", str(COOLDOWN)))
+
+# Number of hosts with pooled connections, and connections kept per host
+POOL_HOSTS = int(os.getenv("SCRAPER_POOL_HOSTS", "32"))
+POOL_SIZE_PER_HOST = int(os.getenv("SCRAPER_POOL_SIZE_PER_HOST", "8"))
+
+
+class ResponseRejected(requests.RequestException):
+    """A response violated the caller's declared expectations"""
+
+
+class ResponseTooLarge(ResponseRejected):
+    """A response body exceeded the allowed size"""
+
+
+class UnexpectedContentType(ResponseRejected):
+    """A response had a content type the caller did not allow"""
+
+
+def check_content_type(response: requests.Response, allowed_content_types: Optional[Iterable[str]]):
+    """Reject a response whose declared content type is not allowed"""
+    if not allowed_content_types:
+        return
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in allowed_content_types:
+        raise UnexpectedContentType(
+            f"Unexpected content type {content_type!r} for {response.url}", response=response
+        )
+
+
+def check_declared_size(response: requests.Response, max_bytes: Optional[int]):
+    """Reject a response whose Content-Length is over the limit"""
+    if not max_bytes:
+        return
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise ResponseTooLarge(
+            f"Response of {content_length} bytes exceeds {max_bytes} for {response.url}", response=response
+        )
+
+
+def check_body_size(response: requests.Response, max_bytes: Optional[int]):
+    """Reject a response whose body is over the limit"""
+    if max_bytes and len(response.content) > max_bytes:
+        raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes for {response.url}", response=response)
+
+
+def read_limited(response: requests.Response, max_bytes: Optional[int]):
+    """Read a streamed body into the response, abandoning it once it exceeds max_bytes"""
+    chunks = []
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                raise ResponseTooLarge(f"Response exceeds {max_bytes} bytes for {response.url}", response=response)
+            chunks.append(chunk)
+    finally:
+        response.close()
+    response._content = b"".join(chunks)
+    response._content_consumed = True
+
+
+class _TimedConnectionMixin:
+    """Record DNS and connect time of new connections on the tracked request"""
+
+    def _new_conn(self):
+        record = current_request()
+        if record is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Let urllib3 resolve again and raise its own error
+            return super()._new_conn()
+        finally:
+            record.dns += time.perf_counter() - start
+
+        # Connect to the resolved addresses in order without resolving again
+        dns_host = self._dns_host
+        last_error = None
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except Exception as e:
+                    last_error = e
+            raise last_error
+        finally:
+            self._dns_host = dns_host
+
+    def connect(self):
+        record = current_request()
+        if record is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        dns_before = record.dns
+        try:
+            return super().connect()
+        finally:
+            # TCP and TLS setup, excluding the DNS lookup counted above
+            record.connect += time.perf_counter() - start - (record.dns - dns_before)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report DNS and connect timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _build_session(retries: int, backoff_factor: float, pool_hosts: int, pool_size: int, user_agent: str):
+    """Create a session with a pooled, retrying adapter"""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = _TimedHTTPAdapter(
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+class HttpClient:
+    """Pooled, retrying HTTP client with caching and per-host rate limiting"""
+
+    def __init__(
+        self,
+        user_agent: str = USER_AGENT,
+        timeout: Tuple[float, float] = TIMEOUT,
+        probe_timeout: Tuple[float, float] = PROBE_TIMEOUT,
+        retries: int = MAX_RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        pool_hosts: int = POOL_HOSTS,
+        pool_size_per_host: int = POOL_SIZE_PER_HOST,
+    ):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.probe_timeout = probe_timeout
+        self.session = _build_session(retries, backoff_factor, pool_hosts, pool_size_per_host, user_agent)
+        # Probes never retry: a dead domain should cost one timeout, not four
+        self.probe_session = _build_session(0, 0, pool_hosts, pool_size_per_host, user_agent)
+        # Probes ("<method> <url>") that failed recently, with when to forget them, oldest first
+        self._probe_misses: Dict[str, float] = {}
+        self._probe_lock = threading.Lock()
+
+    def _request_url(self, url: str, params=None) -> str:
+        """Get the final URL of a request, including query parameters"""
+        if not params:
+            return url
+        return requests.Request("GET", url, params=params).prepare().url
+
+    def get(
+        self,
+        url: str,
+        min_interval: Optional[float] = None,
+        use_cache: bool = True,
+        metrics: Optional[FetchMetrics] = None,
+        max_bytes: Optional[int] = None,
+        allowed_content_types: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """GET a URL through the cache and rate limiter, raising on HTTP errors
+
+        With `max_bytes` or `allowed_content_types` the body is streamed and
+        the request abandoned (raising ResponseRejected) as soon as either is
+        violated, before anything is cached.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        request_url = self._request_url(url, kwargs.get("params"))
+        guarded = bool(max_bytes or allowed_content_types)
+
+        with track_request("GET", request_url, metrics) as record:
+            def before_request():
+                circuit_breaker.check(url)
+                record.sleep += rate_limiter.acquire(url, min_interval)
+
+            def after_response(response: requests.Response):
+                try:
+                    if response.ok:
+                        check_content_type(response, allowed_content_types)
+                    check_declared_size(response, max_bytes)
+                except ResponseRejected:
+                    response.close()
+                    raise
+                read_limited(response, max_bytes)
+
+            if fetch_archive.replaying:
+                response = fetch_archive.replay("GET", request_url)
+            else:
+                try:
+                    if use_cache:
+                        response = http_cache.fetch(
+                            self.session,
+                            url,
+                            before_request=before_request,
+                            after_response=after_response if guarded else None,
+                            **kwargs,
+                        )
+                    else:
+                        before_request()
+                        response = self.session.get(url, stream=guarded, **kwargs)
+                        if guarded:
+                            after_response(response)
+                except requests.RequestException as e:
+                    circuit_breaker.record_failure(url, e)
+                    raise
+                circuit_breaker.record_success(url)
+            record.record_response(response)
+
+            if fetch_archive.recording:
+                fetch_archive.record_response("GET", request_url, response)
+
+            response.raise_for_status()
+            # Cached and replayed bodies were not streamed through the guards
+            check_content_type(response, allowed_content_types)
+            check_body_size(response, max_bytes)
+            return response
+
+    def fetch(self, url: str, **kwargs) -> Optional[requests.Response]:
+        """GET a URL, logging and returning None on failure"""
+        try:
+            return self.get(url, **kwargs)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+    def download(
+        self,
+        url: str,
+        min_interval: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        allowed_content_types: Optional[Iterable[str]] = None,
+        dest: Optional[BinaryIO] = None,
+        metrics: Optional[FetchMetrics] = None,
+    ) -> BinaryIO:
+        """Stream a URL into a file object, rewound and ready to read
+
+        The body never has to fit in memory: it goes to `dest`, or to a
+        spooled temp file that moves to disk once it outgrows
+        SPOOL_MAX_MEMORY. The download is abandoned as soon as the content
+        type or size is known to be unacceptable.
+        """
+        if dest is None:
+            dest = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+
+        try:
+            with track_request("GET", url, metrics) as record:
+                if fetch_archive.replaying:
+                    response = fetch_archive.replay("GET", url)
+                    record.record_response(response)
+                    response.raise_for_status()
+                    check_content_type(response, allowed_content_types)
+                    check_declared_size(response, max_bytes)
+                    check_body_size(response, max_bytes)
+                    dest.write(response.content)
+                else:
+                    circuit_breaker.check(url)
+                    record.sleep += rate_limiter.acquire(url, min_interval)
+                    try:
+                        response = self.session.get(url, timeout=self.timeout, stream=True)
+                    except requests.RequestException as e:
+                        circuit_breaker.record_failure(url, e)
+                        raise
+                    circuit_breaker.record_success(url)
+                    record.record_response(response)
+
+                    with response:
+                        response.raise_for_status()
+                        check_content_type(response, allowed_content_types)
+                        check_declared_size(response, max_bytes)
+
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            record.bytes += len(chunk)
+                            if max_bytes and record.bytes > max_bytes:
+                                raise ResponseTooLarge(
+                                    f"Response exceeds {max_bytes} bytes for {url}", response=response
+                                )
+                            dest.write(chunk)
+
+                    if fetch_archive.recording:
+                        dest.seek(0)
+                        fetch_archive.record("GET", url, response.status_code, response.headers, dest)
+        except BaseException:
+            dest.close()
+            raise
+
+        dest.seek(0)
+        return dest
+
+    def probe(
+        self,
+        url: str,
+        min_interval: Optional[float] = None,
+        metrics: Optional[FetchMetrics] = None,
+        head_only: bool = False,
+    ) -> bool:
+        """Check that a URL answers 200, trying HEAD before GET (or HEAD alone with head_only)"""
+        # The two kinds of probe can disagree, so they are remembered apart
+        method = "PROBE_HEAD" if head_only else "PROBE"
+        if fetch_archive.replaying:
+            try:
+                return fetch_archive.replay(method, url).status_code == 200
+            except requests.RequestException:
+                return False
+
+        miss_key = f"{method} {url}"
+        with self._probe_lock:
+            if self._probe_misses.get(miss_key, 0) > time.time():
+                return False
+
+        with track_request(method, url, metrics) as record:
+            found = self._probe(url, min_interval, record, head_only)
+        if not found:
+            with self._probe_lock:
+                now = time.time()
+                # Misses are kept in expiry order: forget the expired ones so a
+                # long crawl doesn't accumulate every URL it ever guessed
+                for missed, expires in list(self._probe_misses.items()):
+                    if expires > now:
+                        break
+                    del self._probe_misses[missed]
+                self._probe_misses.pop(miss_key, None)
+                self._probe_misses[miss_key] = now + PROBE_MISS_TTL
+        if fetch_archive.recording:
+            fetch_archive.record(method, url, 200 if found else 0, {})
+        return found
+
+    def _probe(self, url: str, min_interval: Optional[float], record: RequestMetrics, head_only: bool) -> bool:
+        try:
+            circuit_breaker.check(url)
+            record.sleep += rate_limiter.acquire(url, min_interval)
+            response = self.probe_session.head(url, timeout=self.probe_timeout, allow_redirects=True)
+            circuit_breaker.record_success(url)
+            record.record_response(response)
+            if response.status_code == 200 or head_only:
+                return response.status_code == 200
+
+            # Some servers don't support HEAD, try GET
+            record.sleep += rate_limiter.acquire(url, min_interval)
+            with self.probe_session.get(url, timeout=self.probe_timeout, allow_redirects=True, stream=True) as response:
+                record.record_response(response)
+                return response.status_code == 200
+        except requests.RequestException as e:
+            circuit_breaker.record_failure(url, e)
+            record.error = type(e).__name__
+            logger.debug(f"Probe failed for {url}: {e}")
+            return False
+
+
+http_client = HttpClient()
@@ -0,0 +1,164 @@
+"""
+Fetch-layer instrumentation for the scrapers
+
+Every request through the shared HTTP client produces a RequestMetrics
+record (time spent in rate-limit sleeps, DNS, connect, time to first byte
+and download, plus bytes and status). Records are emitted as structured
+debug logs and aggregated per host into FetchMetrics collectors, one per
+scraper and one for the whole process.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from scrapers.shared.urls import redact_url
+
+logger = logging.getLogger(__name__)
+
+TIMING_FIELDS = ("sleep", "dns", "connect", "ttfb", "download", "total")
+
+_local = threading.local()
+
+
+@dataclass
+class RequestMetrics:
+    """Timings and outcome of a single request, in seconds and bytes"""
+    method: str
+    url: str
+    host: str
+    status: Optional[int] = None
+    source: str = "network"
+    bytes: int = 0
+    sleep: float = 0.0
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    total: float = 0.0
+    elapsed: Optional[float] = None
+    error: Optional[str] = None
+
+    def record_response(self, response, source: Optional[str] = None):
+        """Take status, size, header timing and source from a response"""
+        self.status = response.status_code
+        if source:
+            self.source = source
+        elif getattr(response, "from_replay", False):
+            self.source = "replay"
+        elif getattr(response, "revalidated", False):
+            self.source = "revalidated"
+        elif getattr(response, "from_cache", False):
+            self.source = "cache"
+        if response.elapsed:
+            self.elapsed = response.elapsed.total_seconds()
+        # Streamed bodies are counted by the caller as they are read
+        content = getattr(response, "_content", None)
+        if isinstance(content, bytes):
+            self.bytes = len(content)
+
+    def finish(self, total: float):
+        """Split wall time into phases once the request is done"""
+        self.total = total
+        if self.elapsed is None:
+            # Failed before any response: the rest was retries and backoff
+            return
+        # requests' elapsed runs from sending until headers are parsed
+        self.ttfb = max(0.0, self.elapsed - self.dns - self.connect)
+        self.download = max(0.0, total - self.sleep - self.dns - self.connect - self.ttfb)
+
+
+def current_request() -> Optional[RequestMetrics]:
+    """Get the request being tracked on this thread, if any"""
+    return getattr(_local, "request", None)
+
+
+class FetchMetrics:
+    """Per-host aggregate of request metrics"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, record: RequestMetrics):
+        """Fold a request into the aggregate"""
+        with self._lock:
+            stats = self._hosts.get(record.host)
+            if stats is None:
+                stats = {
+                    "requests": 0,
+                    "errors": 0,
+                    "bytes": 0,
+                    "statuses": Counter(),
+                    "sources": Counter(),
+                    **{name: 0.0 for name in TIMING_FIELDS},
+                }
+                self._hosts[record.host] = stats
+
+            stats["requests"] += 1
+            stats["bytes"] += record.bytes
+            stats["statuses"][str(record.status) if record.status else "none"] += 1
+            stats["sources"][record.source] += 1
+            if record.error:
+                stats["errors"] += 1
+            for name in TIMING_FIELDS:
+                stats[name] += getattr(record, name)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Get per-host totals"""
+        with self._lock:
+            return {
+                host: {**stats, "statuses": dict(stats["statuses"]), "sources": dict(stats["sources"])}
+                for host, stats in self._hosts.items()
+            }
+
+    def totals(self) -> Dict:
+        """Get totals across all hosts"""
+        totals = {"requests": 0, "errors": 0, "bytes": 0, **{name: 0.0 for name in TIMING_FIELDS}}
+        for stats in self.summary().values():
+            for key in totals:
+                totals[key] += stats[key]
+        return totals
+
+    def log_summary(self, log: logging.Logger = logger):
+        """Log a per-host breakdown of where fetch time went"""
+        for host, stats in sorted(self.summary().items()):
+            log.info(
+                f"  {host}: {stats['requests']} requests, {stats['errors']} errors, "
+                f"{stats['bytes'] / 1024:.1f} KiB, statuses {stats['statuses']}, sources {stats['sources']}"
+            )
+            log.info(
+                "    " + ", ".join(f"{name} {stats[name]:.2f}s" for name in TIMING_FIELDS)
+            )
+
+
+fetch_metrics = FetchMetrics("all")
+
+
+@contextmanager
+def track_request(method: str, url: str, collector: Optional[FetchMetrics] = None):
+    """Track a request made on this thread and record it when done"""
+    # Records are logged, so they never hold credentials from the query string
+    record = RequestMetrics(method=method, url=redact_url(url), host=urlparse(url).netloc.lower())
+    previous = getattr(_local, "request", None)
+    _local.request = record
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        _local.request = previous
+        record.finish(time.perf_counter() - start)
+        for target in (collector, fetch_metrics):
+            if target is not None:
+                target.add(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"fetch {json.dumps(asdict(record))}")
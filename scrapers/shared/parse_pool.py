@@ -0,0 +1,160 @@
+"""
+Process pool parse stage for fetched pages
+
+Parsing pages and extracting their records is CPU-bound and holds the GIL, so
+with fetching already concurrent one process still parses a single page at a
+time. Pages are never parsed on the event loop, which would stall every fetch
+in flight: by default they go to a parse thread, and with more than one parse
+worker (SCRAPER_PARSE_WORKERS) fetchers hand each page's raw bytes to a pool
+of processes and await its records, which come back to the main process as
+each page is parsed.
+
+Only a few pages per worker may be fetched and waiting to be parsed. Once
+that many are, fetchers wait for a page to be parsed before fetching another,
+so a slow parse stage slows fetching down instead of piling pages up in
+memory. The wait starts only when a page's host is free, so pages queued
+behind a busy host never hold up other hosts.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from scrapers.shared.http_cache import build_response
+
+logger = logging.getLogger(__name__)
+
+# Processes parsing pages (1 = parse in the fetching process, 0 = one per CPU core).
+# Off by default: spawning workers only pays off on large crawls on many cores
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "1"))
+# Pages each worker may have waiting before fetchers hold back
+PARSE_QUEUE_PER_WORKER = int(os.getenv("SCRAPER_PARSE_QUEUE_PER_WORKER", "2"))
+
+# Scrapers built in a worker process, by class
+_worker_scrapers: Dict[type, Any] = {}
+
+
+def _init_worker(log_level: int):
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+def _parse_page(scraper_class: type, method: str, url: str, status_code: int, headers: Dict, body: bytes, args):
+    """Rebuild a fetched response in a worker and parse it with a scraper method"""
+    scraper = _worker_scrapers.get(scraper_class)
+    if scraper is None:
+        scraper = _worker_scrapers[scraper_class] = scraper_class()
+    response = build_response(url, status_code, headers, body)
+    return getattr(scraper, method)(response, *args)
+
+
+class ParsePool:
+    """Parse fetched pages off the event loop, with a cap on the pages waiting"""
+
+    def __init__(self, workers: int = PARSE_WORKERS, queue_per_worker: int = PARSE_QUEUE_PER_WORKER):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max(1, self.workers * queue_per_worker)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Scrapers in other threads run their own event loops, each gets its own slots
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use"""
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Parsing pages with {self.workers} processes")
+                # Spawn rather than fork: other scrapers may be running in threads of this process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(logging.getLogger().getEffectiveLevel(),),
+                )
+            return self._executor
+
+    def _get_thread(self) -> ThreadPoolExecutor:
+        """Start the parse thread on first use; one is enough, parsing holds the GIL"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scraper-parse")
+            return self._thread
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+            return slots
+
+    async def fetch_and_parse(self, scraper, url: str, method: str, *args):
+        """Fetch a page with the scraper and parse it with scraper.<method>(response, *args)
+
+        Returns None if the page could not be fetched. A fetch only starts
+        once its host is free and the parse backlog has room, and both are
+        held until the page is parsed. With the pool enabled, each worker
+        builds its own instance of the scraper's class, so the class must be
+        constructible without arguments.
+        """
+        fetcher = scraper.async_fetcher
+        async with fetcher.host_slot(url), self._get_slots():
+            response = await fetcher.fetch_in_slot(url)
+            if response is None:
+                return None
+            return await self._parse(scraper, response, method, args)
+
+    async def _parse(self, scraper, response, method: str, args):
+        """Parse a fetched page in a worker process, or in the parse thread"""
+        loop = asyncio.get_running_loop()
+        if self.enabled:
+            task = functools.partial(
+                _parse_page,
+                type(scraper),
+                method,
+                response.url,
+                response.status_code,
+                dict(response.headers),
+                response.content,
+                args,
+            )
+            try:
+                return await loop.run_in_executor(self._get_executor(), task)
+            except BrokenProcessPool as e:
+                logger.warning(f"Parse worker pool failed ({e}), parsing in a thread")
+                self.workers = 1
+                self._close_processes()
+        parse = functools.partial(getattr(scraper, method), response, *args)
+        return await loop.run_in_executor(self._get_thread(), parse)
+
+    def _close_processes(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def close(self):
+        """Shut down the worker processes and the parse thread"""
+        self._close_processes()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.shutdown(wait=False)
+                self._thread = None
+
+
+parse_pool = ParsePool()
@@ -0,0 +1,138 @@
+"""
+On-disk cache of extracted PDF page text
+
+A page is keyed by a hash of what its text is drawn from: its decoded content
+streams, its resources (fonts, including their encodings and ToUnicode maps)
+and its boxes and rotation. Object numbers are not part of the key, so a page
+carried over unchanged into a regenerated PDF still hits the cache and only
+new or edited pages go through layout analysis again.
+
+Entries are touched when read, and once the cache outgrows its disk budget the
+least recently used ones are evicted, as in the HTTP cache.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from scrapers.shared.disk_budget import DiskBudget, touch
+from scrapers.shared.env import env_flag
+from scrapers.shared.files import atomic_write
+from scrapers.shared.http_cache import DEFAULT_CACHE_DIR
+
+try:
+    import pdfplumber
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+except ImportError:
+    pdfplumber = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_ENABLED = env_flag("SCRAPER_PDF_PAGE_CACHE")
+PAGE_CACHE_MAX_BYTES = int(os.getenv("SCRAPER_PDF_PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Bump when the way page text is extracted changes
+KEY_VERSION = "1"
+
+
+class _PageHasher:
+    """Hash page objects by value, resolving references and decoding streams
+
+    Objects shared between pages (fonts, mostly) are hashed once per document.
+    """
+
+    def __init__(self):
+        self._objects: Dict[int, bytes] = {}
+
+    def _feed(self, digest, obj, path: frozenset):
+        if isinstance(obj, PDFObjRef):
+            if obj.objid in path:
+                digest.update(b"<cycle>")
+                return
+            if obj.objid not in self._objects:
+                sub = hashlib.sha256()
+                self._feed(sub, obj.resolve(), path | {obj.objid})
+                self._objects[obj.objid] = sub.digest()
+            digest.update(self._objects[obj.objid])
+        elif isinstance(obj, PDFStream):
+            self._feed(digest, {k: v for k, v in obj.attrs.items() if k not in ("Length", "Filter", "DecodeParms")}, path)
+            digest.update(obj.get_data())
+        elif isinstance(obj, dict):
+            digest.update(b"{")
+            for name in sorted(obj):
+                digest.update(str(name).encode("utf-8"))
+                self._feed(digest, obj[name], path)
+            digest.update(b"}")
+        elif isinstance(obj, (list, tuple)):
+            digest.update(b"[")
+            for item in obj:
+                self._feed(digest, item, path)
+            digest.update(b"]")
+        else:
+            digest.update(repr(obj).encode("utf-8"))
+
+    def key(self, page) -> str:
+        """Get the cache key of a pdfplumber page"""
+        digest = hashlib.sha256(f"{KEY_VERSION}:{pdfplumber.__version__}".encode("utf-8"))
+        page_obj = page.page_obj
+        # pdfminer has already resolved attributes inherited from the page tree
+        parts = [page_obj.contents, page_obj.resources, page_obj.mediabox, page_obj.cropbox, page_obj.rotate]
+        self._feed(digest, parts, frozenset())
+        return digest.hexdigest()
+
+
+class PdfPageCache:
+    """Extracted page text on disk, keyed by page content"""
+
+    def __init__(
+        self,
+        directory: str = os.path.join(DEFAULT_CACHE_DIR, "pdf_pages"),
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        enabled: bool = PAGE_CACHE_ENABLED,
+    ):
+        self.directory = directory
+        self.enabled = enabled and pdfplumber is not None
+        self.budget = DiskBudget(directory, max_bytes, "PDF page cache", size_suffix=".json")
+
+    def keys(self, pdf) -> Dict[int, str]:
+        """Get the cache key of each page of an open pdfplumber PDF, by page index"""
+        keys = {}
+        if not self.enabled:
+            return keys
+
+        hasher = _PageHasher()
+        for index, page in enumerate(pdf.pages):
+            try:
+                keys[index] = hasher.key(page)
+            except Exception as e:
+                logger.debug(f"Not caching page {index + 1}, could not hash it: {e}")
+        return keys
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the text stored for a page key"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        touch(path)
+        return text
+
+    def store(self, key: str, text: Optional[str]):
+        """Store the text extracted from a page"""
+        path = self._path(key)
+        data = json.dumps({"text": text or ""}).encode("utf-8")
+        try:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            atomic_write(path, data)
+        except OSError as e:
+            logger.warning(f"Could not cache PDF page text: {e}")
+            return
+
+        self.budget.account(len(data) - old_size)
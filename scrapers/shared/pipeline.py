@@ -0,0 +1,291 @@
+"""
+Streaming pipeline from the scrapers to the import API
+
+Scrapers yield records, and each stage after them (normalizing, validating,
+backing up, batching, posting) runs in its own thread, linked to the next by a
+bounded queue. The first batch is posted while the crawl is still running, and
+only a few queues' worth of records are held in memory however big the crawl
+is. A slow stage fills its input queue and pauses the stages before it.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("SCRAPER_PIPELINE_QUEUE_SIZE", "100"))
+
+# Marks the end of a stage's output
+_END = object()
+
+
+class _StageError:
+    """An exception raised in a stage, passed downstream to the caller"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(out: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item on a queue, giving up if the pipeline is stopping"""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(source: queue.Queue, stop: threading.Event) -> Iterator:
+    """Iterate over a stage's output until it ends or the pipeline stops, re-raising its errors"""
+    while True:
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _END:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Pipeline:
+    """Stages chained over a record stream, each in a thread behind a bounded queue
+
+        count = Pipeline(scraper.iter_institutions()).map(clean).batch(100).run(post)
+    """
+
+    def __init__(self, source: Iterable, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self._stages: List[Callable[[Iterator], Iterable]] = []
+
+    def map(self, fn: Callable[[Any], Any]) -> "Pipeline":
+        """Transform each item; items mapped to None are dropped"""
+        self._stages.append(lambda items: (out for out in map(fn, items) if out is not None))
+        return self
+
+    def batch(self, size: int) -> "Pipeline":
+        """Group items into lists of up to size"""
+        self._stages.append(lambda items: _batches(items, size))
+        return self
+
+    def run(self, sink: Callable[[Any], Any]) -> int:
+        """Run every stage and pass the final items to sink, returning how many it got
+
+        The sink runs in the calling thread. An exception in any stage stops
+        the pipeline and is raised here once every stage thread has exited.
+        """
+        stop = threading.Event()
+
+        def run_stage(produce: Callable[[], Iterable], out: queue.Queue):
+            try:
+                for item in produce():
+                    if not _put(out, item, stop):
+                        return
+                _put(out, _END, stop)
+            except BaseException as e:
+                _put(out, _StageError(e), stop)
+
+        # Stage n reads the queue stage n - 1 writes
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self._stages) + 1)]
+        producers = [lambda: self.source] + [
+            (lambda stage=stage, source=source: stage(_drain(source, stop)))
+            for stage, source in zip(self._stages, queues)
+        ]
+        threads = [
+            threading.Thread(target=run_stage, args=(produce, out), name=f"pipeline-stage-{index}", daemon=True)
+            for index, (produce, out) in enumerate(zip(producers, queues))
+        ]
+        for thread in threads:
+            thread.start()
+
+        count = 0
+        try:
+            for item in _drain(queues[-1], stop):
+                sink(item)
+                count += 1
+        finally:
+            # Stages waiting on their input or output see this within a poll
+            # interval; one busy on an item stops at its next put
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return count
+
+
+class RequireFields:
+    """Validation stage that drops records missing any of fields, counting what it sees"""
+
+    def __init__(self, *fields: str):
+        self.fields = fields
+        self.seen = 0
+        self.dropped = 0
+
+    def __call__(self, record: Dict) -> Optional[Dict]:
+        self.seen += 1
+        missing = [field for field in self.fields if not record.get(field)]
+        if missing:
+            self.dropped += 1
+            logger.warning(f"Skipping record without {', '.join(missing)}: {str(record)[:200]}")
+            return None
+        return record
+
+
+class JsonArrayWriter:
+    """Write records to a JSON array file as they stream past
+
+    The file reads the same as json.dump(records, f, indent=2) would write it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def __enter__(self) -> "JsonArrayWriter":
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+        return self
+
+    def write(self, record: Dict) -> Dict:
+        """Append a record, returning it so the writer can be a pipeline stage"""
+        text = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._file.write(f"{',' if self.count else ''}\n  {text}")
+        self.count += 1
+        return record
+
+    def __exit__(self, *exc_info):
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+
+
+class BatchPoster:
+    """Post batches of records to an import endpoint, totalling the results"""
+
+    def __init__(self, endpoint: str, key: str, source: str, noun: str, error_details: int = 5):
+        self.endpoint = endpoint
+        self.key = key
+        self.source = source
+        self.noun = noun
+        self.error_details = error_details
+        self.batches = 0
+        self.created = 0
+        self.updated = 0
+        self.errors: List = []
+
+    def __call__(self, batch: Sequence[Dict]):
+        self.batches += 1
+        number = self.batches
+        payload = {
+            self.key: list(batch),
+            "source": self.source,
+        }
+
+        try:
+            logger.info(f"Sending batch {number} ({len(batch)} {self.noun})...")
+            response = requests.post(
+                self.endpoint,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=300,
+            )
+
+            if response.status_code != 200:
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("error", "Unknown error")
+                    error_details = error_data.get("details", [])
+                    logger.error(f"Batch {number} failed: {error_msg}")
+                    # Log first few errors as examples
+                    for detail in error_details[:self.error_details]:
+                        logger.error(f"  - {detail.get('path', [])}: {detail.get('message', '')}")
+                except Exception:
+                    error_data = response.text
+                    logger.error(f"Batch {number} failed: {error_data[:500]}")
+                self.errors.append(f"Batch {number}: {str(error_data)}")
+                return
+
+            result = response.json()
+            self.created += result.get("results", {}).get("created", 0)
+            self.updated += result.get("results", {}).get("updated", 0)
+            if result.get("results", {}).get("errors"):
+                self.errors.extend(result["results"]["errors"])
+
+        except Exception as e:
+            logger.error(f"Error sending batch {number}: {e}")
+            self.errors.append(f"Batch {number}: {str(e)}")
+
+    def result(self) -> Dict:
+        """Get the import totals in the shape the import API reports them"""
+        logger.info(f"Import completed: Created {self.created}, Updated {self.updated}")
+        if self.errors:
+            logger.warning(f"Total errors: {len(self.errors)}")
+
+        return {
+            "success": True,
+            "results": {
+                "created": self.created,
+                "updated": self.updated,
+                "errors": self.errors,
+            },
+        }
+
+
+def import_records(
+    records: Iterable[Dict],
+    endpoint: str,
+    key: str,
+    source: str,
+    noun: str,
+    batch_size: int = 100,
+    output_file: Optional[str] = None,
+    normalize: Optional[Callable[[Dict], Dict]] = None,
+    required: Sequence[str] = ("name",),
+    error_details: int = 5,
+) -> Dict:
+    """Stream records through normalize, backup, validate, batch and post stages
+
+    The backup gets every record scraped; records missing a required field
+    are only left out of the import. Returns the import totals, plus the
+    number of records that were streamed in "count" and how many of them were
+    not imported for missing fields in "dropped".
+    """
+    pipeline = Pipeline(records)
+    if normalize:
+        pipeline.map(normalize)
+    validate = RequireFields(*required)
+    poster = BatchPoster(endpoint, key, source, noun, error_details)
+
+    if output_file:
+        with JsonArrayWriter(output_file) as backup:
+            pipeline.map(backup.write).map(validate).batch(batch_size).run(poster)
+    else:
+        pipeline.map(validate).batch(batch_size).run(poster)
+
+    if validate.dropped:
+        logger.warning(f"Dropped {validate.dropped} of {validate.seen} {noun} without {', '.join(required)}")
+    result = poster.result()
+    result["count"] = validate.seen
+    result["dropped"] = validate.dropped
+    return result
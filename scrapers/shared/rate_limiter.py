@@ -0,0 +1,112 @@
+"""
+Process-wide rate limiter for the scrapers
+
+One token bucket per host, shared by every scraper in the process, so
+scrapers that hit the same site coordinate instead of each sleeping on its
+own schedule.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = float(os.getenv("SCRAPER_RATE_LIMIT_DELAY", "1.0"))
+DEFAULT_BURST = int(os.getenv("SCRAPER_RATE_LIMIT_BURST", "1"))
+
+
+class TokenBucket:
+    """Token bucket that refills one token every `min_interval` seconds"""
+
+    def __init__(self, min_interval: float, burst: int = 1):
+        self.min_interval = min_interval
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait to use it"""
+        with self._lock:
+            now = time.monotonic()
+            if self.min_interval > 0:
+                elapsed = now - self.updated_at
+                self.tokens = min(self.burst, self.tokens + elapsed / self.min_interval)
+            else:
+                self.tokens = float(self.burst)
+            self.updated_at = now
+
+            # Tokens may go negative: each waiter queues behind the previous one
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * self.min_interval
+
+    def delay(self) -> float:
+        """Return how long a token taken now would have to wait, without taking it"""
+        with self._lock:
+            if self.min_interval <= 0:
+                return 0.0
+            elapsed = time.monotonic() - self.updated_at
+            tokens = min(self.burst, self.tokens + elapsed / self.min_interval)
+            if tokens >= 1:
+                return 0.0
+            return (1 - tokens) * self.min_interval
+
+    def tighten(self, min_interval: float):
+        """Raise the refill interval, never lowering an existing one"""
+        with self._lock:
+            self.min_interval = max(self.min_interval, min_interval)
+
+
+class HostRateLimiter:
+    """Token buckets keyed by host"""
+
+    def __init__(self, default_min_interval: float = DEFAULT_MIN_INTERVAL, burst: int = DEFAULT_BURST):
+        self.default_min_interval = default_min_interval
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, host: str, min_interval: Optional[float] = None) -> TokenBucket:
+        """Get the bucket for a host, creating it on first use"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                interval = self.default_min_interval if min_interval is None else min_interval
+                bucket = TokenBucket(interval, self.burst)
+                self._buckets[host] = bucket
+                return bucket
+
+        if min_interval is not None:
+            bucket.tighten(min_interval)
+        return bucket
+
+    def configure(self, host: str, min_interval: float):
+        """Set the politeness interval for a host (the strictest setting wins)"""
+        self._get_bucket(host.lower(), min_interval)
+
+    def set_crawl_delay(self, host: str, crawl_delay: float):
+        """Honor a robots.txt Crawl-delay for a host"""
+        logger.info(f"Using Crawl-delay of {crawl_delay}s for {host}")
+        self.configure(host, crawl_delay)
+
+    def delay(self, host: str) -> float:
+        """Return how long a request to a host made now would wait"""
+        with self._lock:
+            bucket = self._buckets.get(host.lower())
+        return bucket.delay() if bucket else 0.0
+
+    def acquire(self, url: str, min_interval: Optional[float] = None) -> float:
+        """Block until a request to the URL's host is allowed; return seconds slept"""
+        host = urlparse(url).netloc.lower()
+        wait = self._get_bucket(host, min_interval).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+rate_limiter = HostRateLimiter()
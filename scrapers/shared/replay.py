@@ -0,0 +1,142 @@
+"""
+Record/replay mode for the scraper fetch layer
+
+In record mode every response that passes through the shared HTTP client is
+saved to a compressed archive. In replay mode responses are served from that
+archive with no network access (and optional simulated latency), so full
+scrape runs can be benchmarked offline and deterministically.
+
+Requests are stored and looked up by their redacted URL (see shared/urls.py),
+so API keys in query strings never end up in an archive shared with CI.
+
+    SCRAPER_FETCH_MODE=record SCRAPER_REPLAY_ARCHIVE=run.zip python -m scrapers.nbte.scraper
+    SCRAPER_FETCH_MODE=replay SCRAPER_REPLAY_ARCHIVE=run.zip python -m scrapers.nbte.scraper
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zipfile
+from typing import BinaryIO, Optional, Set, Union
+
+import requests
+
+from scrapers.shared.http_cache import DEFAULT_CACHE_DIR, DROPPED_HEADERS, build_response
+from scrapers.shared.urls import redact_url
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+FETCH_MODE = os.getenv("SCRAPER_FETCH_MODE", LIVE).lower()
+REPLAY_ARCHIVE = os.getenv("SCRAPER_REPLAY_ARCHIVE", os.path.join(DEFAULT_CACHE_DIR, "replay.zip"))
+REPLAY_LATENCY = float(os.getenv("SCRAPER_REPLAY_LATENCY", "0"))
+
+
+class ReplayMiss(requests.ConnectionError):
+    """Raised in replay mode when a request was never recorded"""
+
+
+class FetchArchive:
+    """Compressed archive of recorded responses"""
+
+    def __init__(self, path: str = REPLAY_ARCHIVE, mode: str = FETCH_MODE, latency: float = REPLAY_LATENCY):
+        if mode not in (LIVE, RECORD, REPLAY):
+            raise ValueError(f"Unknown fetch mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._names: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _key(self, method: str, url: str) -> str:
+        """Key a request by its method and redacted URL"""
+        return hashlib.sha256(f"{method.upper()} {redact_url(url)}".encode("utf-8")).hexdigest()
+
+    def _open(self) -> zipfile.ZipFile:
+        """Open the archive on first use"""
+        if self._zip is None:
+            if self.recording:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._zip = zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED)
+                atexit.register(self.close)
+                logger.info(f"Recording responses to {self.path}")
+            else:
+                self._zip = zipfile.ZipFile(self.path, "r")
+                logger.info(f"Replaying responses from {self.path}")
+            self._names = set(self._zip.namelist())
+        return self._zip
+
+    def record(self, method: str, url: str, status_code: int, headers, body: Union[bytes, BinaryIO] = b""):
+        """Save a response; the first recording of a request wins
+
+        The body may be a file object, which is copied into the archive in
+        chunks from its current position rather than read into memory.
+        """
+        key = self._key(method, url)
+        meta = {
+            "method": method.upper(),
+            "url": redact_url(url),
+            "status_code": status_code,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+        }
+
+        with self._lock:
+            archive = self._open()
+            if f"{key}.json" in self._names:
+                return
+            if isinstance(body, bytes):
+                archive.writestr(f"{key}.body", body)
+            else:
+                with archive.open(f"{key}.body", "w", force_zip64=True) as entry:
+                    shutil.copyfileobj(body, entry)
+            archive.writestr(f"{key}.json", json.dumps(meta))
+            self._names.update((f"{key}.json", f"{key}.body"))
+
+    def record_response(self, method: str, url: str, response: requests.Response):
+        """Save a requests.Response"""
+        self.record(method, url, response.status_code, response.headers, response.content)
+
+    def replay(self, method: str, url: str) -> requests.Response:
+        """Serve a recorded response, raising ReplayMiss if there is none"""
+        key = self._key(method, url)
+        with self._lock:
+            archive = self._open()
+            if f"{key}.json" not in self._names:
+                raise ReplayMiss(f"No recorded response for {method.upper()} {redact_url(url)}")
+            meta = json.loads(archive.read(f"{key}.json"))
+            body = archive.read(f"{key}.body")
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        response = build_response(url, meta["status_code"], meta["headers"], body)
+        response.from_replay = True
+        return response
+
+    def close(self):
+        """Write the archive's central directory"""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+
+fetch_archive = FetchArchive()
@@ -0,0 +1,169 @@
+"""
+Process-wide robots.txt cache
+
+robots.txt is fetched lazily on the first request to a host, shared by every
+scraper in the process, kept for a TTL and optionally persisted to disk so
+later runs skip the download entirely.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from scrapers.shared.env import env_flag
+from scrapers.shared.files import atomic_write
+from scrapers.shared.http_cache import DEFAULT_CACHE_DIR
+from scrapers.shared.http_client import http_client
+from scrapers.shared.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_TTL = float(os.getenv("SCRAPER_ROBOTS_TTL", str(24 * 60 * 60)))
+# Retry hosts whose robots.txt could not be fetched sooner than healthy ones
+ROBOTS_FAILURE_TTL = float(os.getenv("SCRAPER_ROBOTS_FAILURE_TTL", "300"))
+ROBOTS_PERSIST = env_flag("SCRAPER_ROBOTS_PERSIST")
+
+
+@dataclass
+class RobotsEntry:
+    """A parsed robots.txt and when it expires"""
+    parser: Optional[RobotFileParser]
+    expires_at: float
+
+
+class RobotsCache:
+    """robots.txt parsers keyed by scheme and host"""
+
+    def __init__(
+        self,
+        ttl: float = ROBOTS_TTL,
+        failure_ttl: float = ROBOTS_FAILURE_TTL,
+        directory: Optional[str] = os.path.join(DEFAULT_CACHE_DIR, "robots") if ROBOTS_PERSIST else None,
+    ):
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.directory = directory
+        self._entries: Dict[str, RobotsEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def can_fetch(self, url: str, user_agent: str) -> bool:
+        """Check if a URL can be fetched according to its host's robots.txt"""
+        parser = self.get_parser(url)
+        if parser is None:
+            return True
+        return parser.can_fetch(user_agent, url)
+
+    def get_parser(self, url: str) -> Optional[RobotFileParser]:
+        """Get the robots.txt parser for a URL's host, loading it on first use"""
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+        entry = self._entries.get(origin)
+        if entry and entry.expires_at > time.time():
+            return entry.parser
+
+        # One download per host even when many threads miss at once
+        with self._lock:
+            host_lock = self._locks.setdefault(origin, threading.Lock())
+        with host_lock:
+            entry = self._entries.get(origin)
+            if entry and entry.expires_at > time.time():
+                return entry.parser
+
+            entry = self._load(origin)
+            self._entries[origin] = entry
+            return entry.parser
+
+    def _load(self, origin: str) -> RobotsEntry:
+        """Load robots.txt for an origin from disk or the network"""
+        stored = self._read_disk(origin)
+        if stored:
+            status, lines, fetched_at = stored
+            logger.debug(f"Using stored robots.txt for {origin}")
+        else:
+            fetched = self._download(origin)
+            if fetched is None:
+                return RobotsEntry(parser=None, expires_at=time.time() + self.failure_ttl)
+            status, lines = fetched
+            fetched_at = time.time()
+            self._write_disk(origin, status, lines, fetched_at)
+
+        parser = self._build_parser(origin, status, lines)
+        crawl_delay = parser.crawl_delay(http_client.user_agent)
+        if crawl_delay:
+            rate_limiter.set_crawl_delay(urlparse(origin).netloc, float(crawl_delay))
+
+        return RobotsEntry(parser=parser, expires_at=fetched_at + self.ttl)
+
+    def _download(self, origin: str):
+        """Fetch robots.txt, returning (status, lines) or None if unavailable"""
+        robots_url = f"{origin}/robots.txt"
+        try:
+            response = http_client.get(robots_url, use_cache=False)
+            logger.info(f"Loaded robots.txt from {robots_url}")
+            return response.status_code, response.text.splitlines()
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if 400 <= status < 500:
+                return status, []
+            logger.warning(f"Could not load robots.txt from {robots_url}: {e}")
+        except requests.RequestException as e:
+            logger.warning(f"Could not load robots.txt from {robots_url}: {e}")
+        return None
+
+    def _build_parser(self, origin: str, status: int, lines: List[str]) -> RobotFileParser:
+        """Build a parser with the same status handling as RobotFileParser.read"""
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        if status in (401, 403):
+            parser.disallow_all = True
+            parser.modified()
+        elif 400 <= status < 500:
+            parser.allow_all = True
+            parser.modified()
+        else:
+            parser.parse(lines)
+        return parser
+
+    def _disk_path(self, origin: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        key = hashlib.sha256(origin.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, origin: str):
+        """Read a stored robots.txt that is still within its TTL"""
+        path = self._disk_path(origin)
+        if not path:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - data["fetched_at"] >= self.ttl:
+            return None
+        return data["status"], data["lines"], data["fetched_at"]
+
+    def _write_disk(self, origin: str, status: int, lines: List[str], fetched_at: float):
+        path = self._disk_path(origin)
+        if not path:
+            return
+        try:
+            atomic_write(
+                path, json.dumps({"origin": origin, "status": status, "lines": lines, "fetched_at": fetched_at})
+            )
+        except OSError as e:
+            logger.warning(f"Could not store robots.txt for {origin}: {e}")
+
+
+robots_cache = RobotsCache()
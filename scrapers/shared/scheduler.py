@@ -0,0 +1,116 @@
+"""
+Host-aware scheduling for crawls that span many hosts
+
+Work is queued per host and started across hosts in turn, each host capped at
+its budget of items in flight. A long run of consecutive items on one host
+(most institutions' course pages are on myschoolgist.com) no longer fills every
+worker while they queue for that host's politeness limit and other hosts sit
+idle: with enough hosts queued, every worker is busy on a different one.
+
+Items carry a priority (lower starts sooner). The next item to start is the
+most urgent one at the head of any host that has budget left and whose rate
+limit would let it through now; among equally urgent hosts, the one served
+least recently goes first. A host still inside its rate-limit interval waits
+without holding a worker.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from scrapers.shared.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class HostScheduler:
+    """Per-host work queues, started round-robin within per-host budgets"""
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        host_budget: int = 1,
+        budgets: Optional[Dict[str, int]] = None,
+        delay: Callable[[str], float] = rate_limiter.delay,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.host_budget = max(1, host_budget)
+        self.budgets = {host.lower(): budget for host, budget in (budgets or {}).items()}
+        self.delay = delay
+        self._queues: Dict[str, List[Tuple[Any, int, Any]]] = defaultdict(list)
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._last_served: Dict[str, int] = defaultdict(int)
+        self._order = itertools.count(1)
+
+    def budget(self, host: str) -> int:
+        """Get how many items of a host may be in flight at once"""
+        return self.budgets.get(host, self.host_budget)
+
+    def add(self, url: str, item: Any, priority: Any = 0):
+        """Queue an item under the host of its URL"""
+        host = urlparse(url).netloc.lower()
+        heapq.heappush(self._queues[host], (priority, next(self._order), item))
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next_host(self) -> Tuple[Optional[str], Optional[float]]:
+        """Pick the host to start an item from now
+
+        Returns the host, or None and how long until a host with budget left
+        is allowed a request (None if no host has budget and work left).
+        """
+        best = None
+        best_key = None
+        soonest = None
+        for host, queue in self._queues.items():
+            if not queue or self._in_flight[host] >= self.budget(host):
+                continue
+            delay = self.delay(host)
+            if delay > 0:
+                soonest = delay if soonest is None else min(soonest, delay)
+                continue
+            key = (queue[0][0], self._last_served[host])
+            if best_key is None or key < best_key:
+                best, best_key = host, key
+        return best, soonest
+
+    async def run(self, work: Callable[[Any], Awaitable]) -> AsyncIterator[Tuple[Any, Any]]:
+        """Run work(item) for every queued item, yielding (item, result) as each finishes
+
+        work should handle its own errors; one that raises stops the run.
+        """
+        tasks: Dict[asyncio.Task, Tuple[str, Any]] = {}
+        hosts = sum(1 for queue in self._queues.values() if queue)
+        logger.info(f"Scheduling {len(self)} items across {hosts} hosts, {self.max_in_flight} at a time")
+        try:
+            while True:
+                wait = None
+                while len(tasks) < self.max_in_flight:
+                    host, wait = self._next_host()
+                    if host is None:
+                        break
+                    _, _, item = heapq.heappop(self._queues[host])
+                    self._in_flight[host] += 1
+                    self._last_served[host] = next(self._order)
+                    tasks[asyncio.ensure_future(work(item))] = (host, item)
+
+                if not tasks:
+                    if wait is None:
+                        return
+                    await asyncio.sleep(wait)
+                    continue
+                # Wake when an item finishes or a waiting host's rate limit lets it through
+                done, _ = await asyncio.wait(tasks, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    host, item = tasks.pop(task)
+                    self._in_flight[host] -= 1
+                    yield item, task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,28 @@
+"""
+URL helpers for the fetch layer
+
+Some requests carry credentials in their query string (the Google Custom
+Search API key, for one). Anything that stores or logs request URLs goes
+through redact_url first, so those values never reach replay archives or logs.
+"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters whose values are credentials, compared case-insensitively
+CREDENTIAL_PARAMS = frozenset({
+    "key", "api_key", "apikey", "access_token", "token", "auth",
+    "password", "secret", "client_secret",
+})
+
+REDACTED = "REDACTED"
+
+
+def redact_url(url: str) -> str:
+    """Replace the values of credential query parameters, leaving other URLs untouched"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(name.lower() in CREDENTIAL_PARAMS for name, _ in params):
+        return url
+    query = urlencode([(name, REDACTED if name.lower() in CREDENTIAL_PARAMS else value) for name, value in params])
+    return urlunsplit(parts._replace(query=query))